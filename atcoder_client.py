@@ -0,0 +1,187 @@
+import os
+import sys
+import time
+import threading
+import requests
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+from email.utils import parsedate_to_datetime
+from logging import getLogger, StreamHandler, INFO
+
+import profiling
+
+# AtCoderへのHTTPアクセスを一元化するクライアント
+# ホストごとのトークンバケットでリクエスト頻度を制限し、429/503ではバックオフして再試行する
+
+# ロガーの設定
+logger = getLogger(__name__)
+handler = StreamHandler(sys.stdout)
+handler.setLevel(INFO)
+logger.addHandler(handler)
+logger.setLevel(INFO)
+
+# --- 設定項目 ---
+# 取得先のベースURL（ローカルのモックサーバーで負荷試験する場合に上書きする）
+ATCODER_BASE_URL = os.environ.get("ATCODER_BASE_URL", "https://atcoder.jp").rstrip("/")
+# 1ホストあたりの1秒間のリクエスト数（既定: 1リクエスト/秒）
+ATCODER_REQUESTS_PER_SECOND = float(os.environ.get("ATCODER_REQUESTS_PER_SECOND", "1.0"))
+# 連続して即時に送れるリクエスト数（バケット容量）
+ATCODER_BURST = int(os.environ.get("ATCODER_BURST", "2"))
+# 429/503を受け取った場合の最大再試行回数
+ATCODER_MAX_RETRIES = int(os.environ.get("ATCODER_MAX_RETRIES", "3"))
+
+# --- 定数 ---
+RETRY_STATUS_CODES = (429, 503)
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+class TokenBucket:
+    """スレッドセーフなトークンバケット"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """トークンを1つ取得する。待機した秒数を返す"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if self.rate > 0:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                else:
+                    self.tokens = float(self.capacity)
+                self.updated_at = now
+
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+
+                # 次のトークンが貯まるまで、またはバックオフ解除まで待つ
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate if self.rate > 0 else 0)
+            time.sleep(wait)
+            waited += wait
+
+    def block_for(self, seconds: float):
+        """429/503を受けた場合に、一定時間すべてのリクエストを止める"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+# ホストごとのバケットと共有セッション
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+_session = requests.Session()
+
+# 実行中の共有リクエスト（URLとパース関数の組 -> 結果）
+_inflight: dict[tuple, Future] = {}
+_inflight_lock = threading.Lock()
+
+# 計測値（待機時間・リクエスト数・スロットリング回数・共有されたリクエスト数）
+metrics = {
+    "requests": 0,
+    "wait_seconds": 0.0,
+    "backoff_seconds": 0.0,
+    "throttled": 0,
+    "coalesced": 0,
+}
+_metrics_lock = threading.Lock()
+
+
+def get_bucket(host: str) -> TokenBucket:
+    """ホストに対応するトークンバケットを返す（なければ作成する）"""
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(ATCODER_REQUESTS_PER_SECOND, ATCODER_BURST)
+            _buckets[host] = bucket
+        return bucket
+
+
+def _record(key: str, value: float = 1):
+    with _metrics_lock:
+        metrics[key] += value
+
+
+def get_retry_after(res: requests.Response, attempt: int) -> float:
+    """Retry-Afterヘッダ、なければ指数バックオフから待機秒数を決める"""
+    retry_after = res.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(BACKOFF_MAX_SECONDS, max(0.0, float(retry_after)))
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after).timestamp()
+                return min(BACKOFF_MAX_SECONDS, max(0.0, retry_at - time.time()))
+            except (TypeError, ValueError):
+                pass
+    return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """レート制限付きでGETリクエストを送る（429/503はバックオフして再試行）"""
+    bucket = get_bucket(urlsplit(url).netloc)
+
+    attempt = 0
+    while True:
+        _record("wait_seconds", bucket.acquire())
+        _record("requests")
+        with profiling.stage("fetch"):
+            res = _session.get(url, **kwargs)
+
+        if res.status_code not in RETRY_STATUS_CODES or attempt >= ATCODER_MAX_RETRIES:
+            return res
+
+        backoff = get_retry_after(res, attempt)
+        logger.info(f"{res.status_code} を受け取りました。{backoff:.1f}秒待って再試行します: {url}")
+        _record("throttled")
+        _record("backoff_seconds", backoff)
+        bucket.block_for(backoff)
+        attempt += 1
+
+
+def fetch_shared(url: str, parse, **kwargs):
+    """同じURL・同じパース関数の同時リクエストを1回の取得とパースにまとめる
+
+    parse はレスポンスを受け取って結果を返す関数。実行中の同一リクエストがあれば
+    その完了を待って同じ結果（または例外）を受け取る。結果は呼び出し元で共有されるため変更しないこと。
+    """
+    key = (url, parse)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not is_leader:
+        _record("coalesced")
+        return future.result()
+
+    try:
+        future.set_result(parse(get(url, **kwargs)))
+    except BaseException as e:
+        future.set_exception(e)
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+    return future.result()
+
+
+def log_metrics():
+    """レート制限の計測値をログに出力する"""
+    if metrics["requests"] == 0:
+        return
+    logger.info(
+        f"HTTPリクエスト: {metrics['requests']} 件, "
+        f"レート制限による待機: {metrics['wait_seconds']:.2f}秒 "
+        f"(うちバックオフ {metrics['backoff_seconds']:.2f}秒, 429/503: {metrics['throttled']} 回), "
+        f"共有された同時リクエスト: {metrics['coalesced']} 件"
+    )
@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from logging import getLogger, StreamHandler, INFO
+
+# 開催予定コンテストのローカルカレンダー
+# コンテスト一覧のスクレイピング結果をファイルに保存し、数時間に1回だけ更新する
+# 非開催日はファイルを読むだけで「今日は開催なし」と判定できる（期限切れでも、今日より後のABCが載っていれば再取得しない）
+
+# ロガーの設定
+logger = getLogger(__name__)
+handler = StreamHandler(sys.stdout)
+handler.setLevel(INFO)
+logger.addHandler(handler)
+logger.setLevel(INFO)
+
+# --- 設定項目 ---
+# カレンダーを再取得するまでの時間（時間単位）
+CONTEST_CALENDAR_TTL_HOURS = float(os.environ.get("CONTEST_CALENDAR_TTL_HOURS", "6"))
+
+# --- 定数 ---
+CALENDAR_FILE = "contest_calendar.json"  # 開催予定コンテストを保存するファイル
+# 開始済みのコンテストを再取得後も残しておく期間（結果ポーリング用）
+ENDED_CONTEST_RETENTION_SECONDS = 2 * 24 * 3600
+
+# JST（日本標準時）のタイムゾーン
+JST = timezone(timedelta(hours=9))
+
+
+def load_calendar() -> dict | None:
+    """カレンダーファイルを読み込む"""
+    if not os.path.exists(CALENDAR_FILE):
+        logger.info("カレンダーファイルが存在しません（初回実行）")
+        return None
+
+    try:
+        with open(CALENDAR_FILE, "r") as f:
+            calendar = json.load(f)
+        if not isinstance(calendar.get("contests"), list):
+            raise ValueError("contests がありません")
+        return calendar
+    except (OSError, ValueError, AttributeError) as e:
+        logger.info(f"カレンダーファイルの読み込みに失敗: {e}")
+        return None
+
+
+def save_calendar(contests: list[dict], fetched_at: float | None = None) -> dict:
+    """開催予定コンテストをカレンダーファイルに書き込む"""
+    calendar = {
+        "fetched_at": int(fetched_at if fetched_at is not None else time.time()),
+        "contests": sorted(contests, key=lambda c: c.get("start_epoch_second", 0)),
+    }
+    # 書き込み途中のファイルを読まないよう、一時ファイル経由で置き換える
+    tmp_file = f"{CALENDAR_FILE}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(calendar, f, ensure_ascii=False)
+    os.replace(tmp_file, CALENDAR_FILE)
+    logger.info(f"カレンダーを更新しました: {len(contests)} 件")
+    return calendar
+
+
+def is_fresh(calendar: dict, now: float | None = None) -> bool:
+    """カレンダーが有効期限内かチェックする"""
+    now = now if now is not None else time.time()
+    return now - calendar.get("fetched_at", 0) < CONTEST_CALENDAR_TTL_HOURS * 3600
+
+
+def get_calendar(fetch_contests) -> dict | None:
+    """有効なカレンダーを返す。期限切れの場合だけ fetch_contests() で再取得する
+
+    fetch_contests は開催予定コンテストのリスト（取得失敗時はNone）を返す関数。
+    期限切れでも、今日開始するコンテストがなく今日より後のコンテストが載っていれば、
+    「今日は開催なし」の判定には十分なので再取得しない（リマインダーの実行間隔はTTLより長いため）。
+    再取得に失敗した場合は、期限切れでも手元のカレンダーを返す。
+    """
+    calendar = load_calendar()
+    if calendar and is_fresh(calendar):
+        logger.info("カレンダーは有効期限内です（ネットワークアクセスなし）")
+        return calendar
+    if calendar and is_nothing_today(calendar):
+        logger.info("カレンダーは期限切れですが、次のコンテストは明日以降のため再取得しません（ネットワークアクセスなし）")
+        return calendar
+
+    contests = fetch_contests()
+    if contests is None:
+        if calendar:
+            logger.info("カレンダーの再取得に失敗したため、期限切れのカレンダーを使用します。")
+        return calendar
+
+    # 開始済みのコンテストは一覧の「開催予定」から消えるため、終了直後のものは引き継ぐ
+    if calendar:
+        now = time.time()
+        known_ids = {c.get("contest_id") for c in contests}
+        contests = contests + [
+            c for c in calendar["contests"]
+            if c.get("contest_id") not in known_ids
+            and get_end_epoch(c) > now - ENDED_CONTEST_RETENTION_SECONDS
+            and c.get("start_epoch_second", 0) <= now
+        ]
+
+    return save_calendar(contests)
+
+
+def get_end_epoch(contest: dict) -> int:
+    """コンテストの終了時刻（epoch秒）を返す"""
+    if contest.get("end_epoch_second"):
+        return contest["end_epoch_second"]
+    start_epoch = contest.get("start_epoch_second", 0)
+    return start_epoch + contest.get("duration_second", 0) if start_epoch else 0
+
+
+def find_contest_on(calendar: dict, date) -> dict | None:
+    """指定日（JST）に開始するコンテストを返す"""
+    for contest in calendar.get("contests", []):
+        start_epoch = contest.get("start_epoch_second", 0)
+        if start_epoch and datetime.fromtimestamp(start_epoch, tz=JST).date() == date:
+            return contest
+    return None
+
+
+def find_contest_today(calendar: dict) -> dict | None:
+    """今日（JST）開始するコンテストを返す"""
+    return find_contest_on(calendar, datetime.now(JST).date())
+
+
+def is_nothing_today(calendar: dict) -> bool:
+    """今日（JST）開始するコンテストがなく、明日以降のコンテストが載っているか"""
+    today = datetime.now(JST).date()
+    if find_contest_on(calendar, today):
+        return False
+    return any(
+        datetime.fromtimestamp(c["start_epoch_second"], tz=JST).date() > today
+        for c in calendar.get("contests", [])
+        if c.get("start_epoch_second")
+    )
+
+
+def find_unfinished_contest(calendar: dict, now: float | None = None) -> dict | None:
+    """開始済みでまだ終了していないコンテストを返す（結果ポーリングを始めるかの判定用）"""
+    now = now if now is not None else time.time()
+    for contest in calendar.get("contests", []):
+        start_epoch = contest.get("start_epoch_second", 0)
+        if start_epoch and start_epoch <= now < get_end_epoch(contest):
+            return contest
+    return None
+
+
+def find_latest_ended_contest(calendar: dict, now: float | None = None) -> dict | None:
+    """終了済みのコンテストのうち最も新しいものを返す"""
+    now = now if now is not None else time.time()
+    ended = [c for c in calendar.get("contests", []) if 0 < get_end_epoch(c) <= now]
+    return max(ended, key=get_end_epoch, default=None)
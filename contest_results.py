@@ -0,0 +1,86 @@
+import sys
+import requests
+from logging import getLogger, StreamHandler, INFO
+
+import atcoder_client
+from json_stream import iter_json_array
+
+# コンテスト結果JSONからロスター全員の結果をまとめて取得する
+# ユーザーごとに履歴ページを取得する代わりに、/contests/{id}/results/json を1回だけ取得して照合する
+
+# ロガーの設定
+logger = getLogger(__name__)
+handler = StreamHandler(sys.stdout)
+handler.setLevel(INFO)
+logger.addHandler(handler)
+logger.setLevel(INFO)
+
+# --- 定数 ---
+ATCODER_RESULTS_JSON_URL = atcoder_client.ATCODER_BASE_URL + "/contests/{contest_id}/results/json"
+RESULTS_CHUNK_SIZE = 64 * 1024  # レスポンスを読み進める単位
+
+
+def to_result(entry: dict) -> dict:
+    """結果JSONの参加者1人分を通知用の形式に変換する"""
+    old_rating = entry.get("OldRating", 0)
+    new_rating = entry.get("NewRating", 0)
+    return {
+        "user_id": entry["UserScreenName"],
+        "contest_name": entry.get("ContestName", ""),
+        "place": entry.get("Place", 0),
+        "performance": entry.get("Performance", 0),
+        "old_rating": old_rating,
+        "new_rating": new_rating,
+        "rating_change": new_rating - old_rating,
+        "is_rated": bool(entry.get("IsRated")),
+    }
+
+
+def match_roster(entries, user_ids: set[str]) -> tuple[dict[str, dict], int]:
+    """参加者を順に見て、ロスターのユーザーだけを集合で照合する（全員見つかった時点で打ち切る）
+
+    Returns:
+        (ユーザーIDごとの結果, 照合した参加者数)
+    """
+    results = {}
+    scanned = 0
+    for entry in entries:
+        scanned += 1
+        user_id = entry.get("UserScreenName")
+        if user_id in user_ids:
+            results[user_id] = to_result(entry)
+            if len(results) == len(user_ids):
+                break
+    return results, scanned
+
+
+def fetch_roster_results(contest_id: str, user_ids: list[str]) -> dict[str, dict] | None:
+    """コンテスト結果を1回だけ取得し、ロスターのユーザーの結果を返す（未公開・取得失敗時はNone）
+
+    結果JSONは参加者数に比例して大きくなるため、全体を読み込まずに要素ごとに逐次パースする。
+    ロスター全員が見つかった時点で残りのレスポンスは読まずに接続を閉じる。
+    """
+    url = ATCODER_RESULTS_JSON_URL.format(contest_id=contest_id)
+    res = None
+    try:
+        logger.info(f"コンテスト結果を取得中: {url}")
+        res = atcoder_client.get(url, timeout=30, stream=True)
+        if res.status_code == 404:
+            logger.info(f"コンテスト {contest_id} の結果ページが見つかりませんでした（404エラー）")
+            return None
+        res.raise_for_status()
+        entries = iter_json_array(res.iter_content(chunk_size=RESULTS_CHUNK_SIZE))
+        results, scanned = match_roster(entries, set(user_ids))
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error(f"コンテスト結果の取得に失敗しました: {e}")
+        return None
+    finally:
+        if res is not None:
+            res.close()
+
+    if scanned == 0:
+        logger.info(f"コンテスト {contest_id} の結果はまだ公開されていません。")
+        return None
+
+    logger.info(f"コンテスト {contest_id} の結果: 参加者 {scanned} 人を照合し、ロスターの {len(results)}/{len(user_ids)} 人が見つかりました。")
+    return results
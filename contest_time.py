@@ -0,0 +1,78 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+# コンテスト日時の解析
+# AtCoderの日時文字列を1回だけ解析し、開始・終了時刻と各種表示用の文字列をまとめて保持する
+
+# JST（日本標準時）のタイムゾーン
+JST = timezone(timedelta(hours=9))
+
+# 曜日（datetime.weekday() の順）
+WEEKDAYS = ['月', '火', '水', '木', '金', '土', '日']
+
+# "2025-07-12(土) 21:00" と "2025-07-12 21:00:00+0900" の両方に一致するパターン
+CONTEST_DATE_PATTERN = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})(?:\([^)]+\))?\s+(\d{1,2}):(\d{2})(?::\d{2}([+-])(\d{2})(\d{2}))?'
+)
+
+
+@dataclass(frozen=True)
+class ContestTime:
+    """コンテストの開始・終了時刻（JST）と表示用の文字列"""
+
+    start_epoch: int
+    end_epoch: int
+    weekday: str  # 開始日の曜日（JST）
+    discord: str  # Discordタイムスタンプ形式（例: <t:1752321600:f> - <t:1752327600:t>）
+    display: str  # 日本時間の表示形式（例: 2025/07/12(土) 21:00 - 22:40）
+
+    @property
+    def start(self) -> datetime:
+        return datetime.fromtimestamp(self.start_epoch, tz=JST)
+
+
+@lru_cache(maxsize=256)
+def from_epoch(start_epoch: int, duration_second: int) -> ContestTime:
+    """開始時刻（epoch秒）とコンテスト時間から ContestTime を作る"""
+    end_epoch = start_epoch + duration_second
+    start = datetime.fromtimestamp(start_epoch, tz=JST)
+    end = datetime.fromtimestamp(end_epoch, tz=JST)
+    weekday = WEEKDAYS[start.weekday()]
+
+    return ContestTime(
+        start_epoch=start_epoch,
+        end_epoch=end_epoch,
+        weekday=weekday,
+        discord=f"<t:{start_epoch}:f> - <t:{end_epoch}:t>",
+        display=f"{start.strftime('%Y/%m/%d')}({weekday}) {start.strftime('%H:%M')} - {end.strftime('%H:%M')}",
+    )
+
+
+@lru_cache(maxsize=256)
+def parse_start_epoch(date_str: str) -> int | None:
+    """AtCoderの日時文字列から開始時刻（epoch秒）を求める（解析できない場合はNone）"""
+    date_match = CONTEST_DATE_PATTERN.search(date_str)
+    if not date_match:
+        return None
+
+    year, month, day, hour, minute = map(int, date_match.group(1, 2, 3, 4, 5))
+    sign, offset_hour, offset_minute = date_match.group(6, 7, 8)
+    tz = JST
+    if sign:
+        offset = timedelta(hours=int(offset_hour), minutes=int(offset_minute))
+        tz = timezone(offset if sign == '+' else -offset)
+
+    try:
+        return int(datetime(year, month, day, hour, minute, tzinfo=tz).timestamp())
+    except ValueError:
+        return None
+
+
+def parse_contest_time(date_str: str, duration_second: int) -> ContestTime | None:
+    """AtCoderの日時文字列を解析して ContestTime を返す（解析できない場合はNone）"""
+    start_epoch = parse_start_epoch(date_str)
+    if start_epoch is None:
+        return None
+    return from_epoch(start_epoch, duration_second)
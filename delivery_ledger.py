@@ -0,0 +1,133 @@
+import os
+import sys
+import json
+import time
+import hashlib
+from logging import getLogger, StreamHandler, INFO
+
+import webhook_health
+
+# 通知の配信記録（ユーザー・コンテスト・Webhookごと）
+# 生成済みのメッセージと各Webhookへの配信結果を保存し、再試行では未配信のWebhookにだけ送り直す
+
+# ロガーの設定
+logger = getLogger(__name__)
+handler = StreamHandler(sys.stdout)
+handler.setLevel(INFO)
+logger.addHandler(handler)
+logger.setLevel(INFO)
+
+# --- 定数 ---
+MAX_DELIVERY_ATTEMPTS = 24  # 再試行を諦めるまでの試行回数（5分おきで約2時間）
+RETENTION_SECONDS = 14 * 24 * 3600  # 配信記録を残す期間
+
+
+def idempotency_key(user_id: str, contest_id: str, webhook_url: str) -> str:
+    """(ユーザー, コンテスト, Webhook) ごとの冪等キー（URLのトークンは保存しない）"""
+    return hashlib.sha256(f"{user_id}:{contest_id}:{webhook_url}".encode()).hexdigest()[:16]
+
+
+def message_key(user_id: str, contest_id: str) -> str:
+    return f"{user_id}:{contest_id}"
+
+
+class DeliveryLedger:
+    """生成済みメッセージとWebhookごとの配信状況"""
+
+    def __init__(self, state_file: str):
+        self.state_file = state_file
+        self.messages = self._load()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.info(f"配信記録の読み込みに失敗: {e}")
+            return {}
+
+    def save(self):
+        """古い記録を削除して配信記録をファイルに書き込む"""
+        now = time.time()
+        self.messages = {
+            key: entry for key, entry in self.messages.items()
+            if now - entry.get("created_at", now) < RETENTION_SECONDS
+        }
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self.messages, f, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
+
+    def has_message(self, user_id: str, contest_id: str) -> bool:
+        """このユーザー・コンテストのメッセージが生成済みか（不参加として記録済みの場合も含む）"""
+        return message_key(user_id, contest_id) in self.messages
+
+    def record_message(self, user_id: str, contest_id: str, message: str):
+        """生成したメッセージを記録する（記録済みの場合は何もしない）"""
+        self.messages.setdefault(message_key(user_id, contest_id), {
+            "user_id": user_id,
+            "contest_id": contest_id,
+            "message": message,
+            "created_at": int(time.time()),
+            "deliveries": {},
+        })
+
+    def record_absent(self, user_id: str, contest_id: str):
+        """コンテスト結果に載っていなかったユーザーを記録する（送信するメッセージはない）"""
+        self.messages.setdefault(message_key(user_id, contest_id), {
+            "user_id": user_id,
+            "contest_id": contest_id,
+            "message": None,
+            "created_at": int(time.time()),
+            "deliveries": {},
+        })
+
+    def undelivered(self, user_id: str, contest_id: str, webhook_urls: list[str]) -> list[str]:
+        """まだ配信できていないWebhookのリスト（試行回数の上限に達したものは除く）"""
+        entry = self.messages.get(message_key(user_id, contest_id))
+        if not entry:
+            return list(webhook_urls)
+
+        urls = []
+        for url in webhook_urls:
+            delivery = entry["deliveries"].get(idempotency_key(user_id, contest_id, url), {})
+            if not delivery.get("delivered") and delivery.get("attempts", 0) < MAX_DELIVERY_ATTEMPTS:
+                urls.append(url)
+        return urls
+
+    def record_results(self, user_id: str, contest_id: str, results: dict[str, str]):
+        """Webhookごとの配信結果（webhook_health.deliver の戻り値）を記録する
+
+        サーキットが開いていてスキップしたWebhookは試行回数に数えない（再送の対象としては残す）。
+        """
+        entry = self.messages[message_key(user_id, contest_id)]
+        for url, status in results.items():
+            delivery = entry["deliveries"].setdefault(
+                idempotency_key(user_id, contest_id, url), {"delivered": False, "attempts": 0}
+            )
+            if status == webhook_health.SKIPPED:
+                continue
+            delivery["attempts"] += 1
+            if status == webhook_health.SENT:
+                delivery["delivered"] = True
+                delivery["delivered_at"] = int(time.time())
+
+    def pending(self, webhook_urls: list[str], user_id: str | None = None) -> list[tuple[str, str, str, list[str]]]:
+        """未配信のWebhookが残っている (ユーザーID, コンテストID, メッセージ, 未配信のWebhook) のリスト
+
+        user_id を省略した場合はすべてのユーザーが対象。
+        一度も送信を試みていないWebhook（後から追加されたもの）には過去のメッセージを送らない。
+        """
+        pending = []
+        for entry in self.messages.values():
+            if entry["message"] is None or (user_id is not None and entry["user_id"] != user_id):
+                continue
+            urls = [
+                url for url in self.undelivered(entry["user_id"], entry["contest_id"], webhook_urls)
+                if idempotency_key(entry["user_id"], entry["contest_id"], url) in entry["deliveries"]
+            ]
+            if urls:
+                pending.append((entry["user_id"], entry["contest_id"], entry["message"], urls))
+        return pending
@@ -0,0 +1,132 @@
+import os
+import re
+import sys
+import json
+import html
+import hashlib
+from logging import getLogger, StreamHandler, INFO
+
+# 履歴テーブルの差分検出
+# 履歴ページの table#history をBeautifulSoupを使わずに切り出し、テーブル全体のダイジェストと
+# 行（コンテスト）ごとのフィンガープリントを保存する。ダイジェストが前回と同じならパースを省略し、
+# 変わっていればフィンガープリントの異なる行（レーティングの訂正・Unratedからの変更など）だけを返す
+# フィンガープリントは成績の列だけから作り、表示言語や順位表記の違いでは変わらないようにする
+
+# ロガーの設定
+logger = getLogger(__name__)
+handler = StreamHandler(sys.stdout)
+handler.setLevel(INFO)
+logger.addHandler(handler)
+logger.setLevel(INFO)
+
+# --- 定数 ---
+TABLE_START = '<table id="history"'
+TABLE_END = "</table>"
+ROW_PATTERN = re.compile(r'<tr[^>]*>(.*?)</tr>', re.S)
+CELL_PATTERN = re.compile(r'<td[^>]*>(.*?)</td>', re.S)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+CONTEST_ID_PATTERN = re.compile(r'href="/contests/([^/"?]+)"')
+# フィンガープリントに使う列（パフォーマンス・新レーティング・差分）
+PERFORMANCE_COLUMN = 3
+NEW_RATING_COLUMN = 4
+RATING_CHANGE_COLUMN = 5
+# 1回の実行で再通知する訂正の上限（これを超える・大半の行が変わった場合はサイト側の表示変更とみなす）
+MAX_CORRECTIONS_PER_RUN = 3
+
+
+def extract_history_table(page_html: str) -> str | None:
+    """履歴ページから table#history の部分だけを切り出す（見つからなければNone）"""
+    start = page_html.find(TABLE_START)
+    if start < 0:
+        return None
+    end = page_html.find(TABLE_END, start)
+    if end < 0:
+        return None
+    return page_html[start:end + len(TABLE_END)]
+
+
+def table_digest(table_html: str) -> str:
+    return hashlib.sha256(table_html.encode()).hexdigest()
+
+
+def cell_text(cell_html: str) -> str:
+    """セルのタグを除いた表示テキスト"""
+    return " ".join(html.unescape(TAG_PATTERN.sub("", cell_html)).split())
+
+
+def row_fingerprints(table_html: str) -> dict[str, str]:
+    """コンテストIDごとの行のフィンガープリント（パフォーマンス・新レーティング・差分・Rated かどうか）"""
+    tbody_start = table_html.find("<tbody")
+    fingerprints = {}
+    for row in ROW_PATTERN.findall(table_html, max(tbody_start, 0)):
+        id_match = CONTEST_ID_PATTERN.search(row)
+        cells = CELL_PATTERN.findall(row)
+        if not id_match or len(cells) <= RATING_CHANGE_COLUMN:
+            continue
+        performance = cell_text(cells[PERFORMANCE_COLUMN])
+        new_rating = cell_text(cells[NEW_RATING_COLUMN])
+        rating_change = cell_text(cells[RATING_CHANGE_COLUMN])
+        is_rated = rating_change != "-"
+        fields = f"{performance}\t{new_rating}\t{rating_change}\t{is_rated}"
+        fingerprints[id_match.group(1)] = hashlib.sha256(fields.encode()).hexdigest()[:16]
+    return fingerprints
+
+
+class HistoryState:
+    """前回の履歴テーブルのダイジェストと行ごとのフィンガープリント（ユーザーごと）"""
+
+    def __init__(self, state_file: str, user_id: str):
+        self.state_file = state_file
+        self.user_id = user_id
+        state = self._load()
+        if state and state.get("user_id") != user_id:
+            # 別のユーザーの状態は比較に使わず、今回のテーブルで記録し直す
+            logger.info("履歴状態ファイルは別のユーザーのものです。今回の履歴で記録し直します。")
+            state = {}
+        self.digest = state.get("digest")
+        self.rows = state.get("rows", {})
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.info(f"履歴状態ファイルの読み込みに失敗: {e}")
+            return {}
+
+    def is_unchanged(self, table_html: str) -> bool:
+        """テーブルが前回から変わっていないか（ダイジェストの比較だけで判定する）"""
+        return self.digest is not None and self.digest == table_digest(table_html)
+
+    def modified_rows(self, table_html: str) -> dict[str, str]:
+        """前回もあった行のうち内容が変わった行（コンテストID → 新しいフィンガープリント）
+
+        新しく追加された行は含めない（最新コンテストの通知は従来どおり last_contest.txt で判定する）。
+        変わった行が多すぎる場合は個別の訂正ではなく表示の変更とみなし、何も返さない（記録し直すだけ）。
+        """
+        modified = {
+            contest_id: fingerprint
+            for contest_id, fingerprint in row_fingerprints(table_html).items()
+            if contest_id in self.rows and self.rows[contest_id] != fingerprint
+        }
+        if len(modified) > MAX_CORRECTIONS_PER_RUN or (len(modified) > 1 and len(modified) * 2 > len(self.rows)):
+            logger.warning(
+                f"履歴の {len(modified)}/{len(self.rows)} 行が変わっています。"
+                "訂正としては通知せず、今回の履歴で記録し直します。"
+            )
+            return {}
+        return modified
+
+    def update(self, table_html: str):
+        """現在のテーブルを記録する"""
+        self.digest = table_digest(table_html)
+        self.rows = row_fingerprints(table_html)
+
+    def save(self):
+        """状態をファイルに書き込む"""
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({"user_id": self.user_id, "digest": self.digest, "rows": self.rows}, f)
+        os.replace(tmp_file, self.state_file)
@@ -0,0 +1,85 @@
+import json
+import codecs
+from typing import Any, Iterable, Iterator
+
+# トップレベルがJSON配列のレスポンスを要素ごとに逐次パースする
+# 全体を json.loads せずに、受信したチャンクから要素を1つずつ取り出す（保持するのは未処理の部分だけ）
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_json_array(chunks: Iterable[bytes | str]) -> Iterator[Any]:
+    """JSON配列の要素を先頭から順に返す（途中で打ち切ると残りのチャンクは読まない）"""
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunk_iter = iter(chunks)
+    buffer = ""
+    position = 0
+    finished = False
+
+    def read_more() -> bool:
+        nonlocal buffer, position, finished
+        if finished:
+            return False
+        # 処理済みの部分を捨ててからチャンクを追加する
+        buffer = buffer[position:]
+        position = 0
+        for chunk in chunk_iter:
+            text = text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                buffer += text
+                return True
+        buffer += text_decoder.decode(b"", final=True)
+        finished = True
+        return False
+
+    def skip_whitespace() -> str | None:
+        """空白を読み飛ばして次の文字を返す（データの終わりならNone）"""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not read_more():
+                return None
+
+    if skip_whitespace() != "[":
+        raise ValueError("JSON配列ではありません")
+    position += 1
+
+    expect_value = True
+    after_comma = False
+    while True:
+        char = skip_whitespace()
+        if char is None:
+            raise ValueError("JSON配列が途中で終わっています")
+        if char == "]":
+            if after_comma:
+                raise ValueError("JSON配列の末尾にカンマがあります")
+            return
+        if not expect_value:
+            if char != ",":
+                raise ValueError(f"JSON配列の区切りが不正です: {char!r}")
+            position += 1
+            expect_value = True
+            after_comma = True
+            continue
+
+        # 要素が揃うまでチャンクを読み足してからデコードする
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, position)
+                # 数値はチャンクの境目で途切れている可能性があるため、直後が区切り文字か確認する
+                if finished or (end < len(buffer) and buffer[end] in _DELIMITERS):
+                    break
+            except json.JSONDecodeError:
+                if finished:
+                    raise
+            read_more()
+
+        position = end
+        expect_value = False
+        after_comma = False
+        yield value
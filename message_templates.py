@@ -0,0 +1,109 @@
+import re
+from functools import lru_cache
+
+# 通知メッセージの文言
+# 各行の文言を1か所にまとめ、問題リンク・ハッシュタグなどコンテストごとの部分はキャッシュする
+# ロスターの全員・複数のWebhookに送る場合も、メッセージごとの処理はf-stringの連結だけになる
+
+# --- 定数 ---
+ATCODER_URL = "https://atcoder.jp"  # メッセージに載せる公開URL
+PROBLEM_LETTERS = "abcdefg"  # リマインダーに載せる問題（A〜G）
+
+
+# --- メッセージの各行（文言はここにまとめ、f-stringで組み立てる） ---
+# レーティング変動通知（notifier.py）
+def result_summary(user_id: str, contest_name: str, rank: str) -> str:
+    return f"{user_id}さんの{contest_name}での成績：{rank}"
+
+
+def result_performance(performance) -> str:
+    return f"パフォーマンス：{performance}相当"
+
+
+def result_rating(old_rating, new_rating, change_text: str, emoji: str) -> str:
+    return f"レーティング：{old_rating}→{new_rating} ({change_text}) {emoji}"
+
+
+def result_updated(contest_name: str) -> str:
+    return f"🔄 {contest_name}の結果が更新されました"
+
+
+def result_fallback_summary(user_id: str, contest_name: str) -> str:
+    return f"{user_id}さんの{contest_name}に参加しました！"
+
+
+def result_footer(hashtag: str, share_url: str | None = None) -> str:
+    if share_url:
+        return f"#AtCoder {hashtag} {share_url}?lang=ja"
+    return f"#AtCoder {hashtag}"
+
+
+# ABCリマインダー（reminder.py）
+def reminder_morning(contest_name: str, contest_time: str, contest_url: str) -> str:
+    return f"🌅 おはようございます！今日は{contest_name}が開催されます！\n📅 開催時間: {contest_time}\n🔗 {contest_url}"
+
+
+def reminder_evening(contest_name: str, contest_time: str, contest_url: str, problems_text: str) -> str:
+    return (
+        f"🌙 お疲れ様です！{contest_name}が開催中または間もなく開始です！\n📅 開催時間: {contest_time}\n"
+        f"🔗 {contest_url}\n📝 問題: {problems_text}"
+    )
+
+
+def reminder_default(contest_name: str, contest_time: str, contest_url: str) -> str:
+    return f"📢 {contest_name}のリマインドです！\n📅 開催時間: {contest_time}\n🔗 {contest_url}"
+
+
+# ロスター集計（rating_stats.py）
+def leaderboard_header(contest_name: str, participants: int) -> str:
+    return f"📊 {contest_name} ロスター集計（参加 {participants} 人）"
+
+
+def leaderboard_median(median_performance) -> str:
+    return f"パフォーマンス中央値：{median_performance}"
+
+
+def leaderboard_gainer(rank: int, user_id: str, change_text: str, old_rating, new_rating) -> str:
+    return f"{rank}. {user_id} {change_text} ({old_rating}→{new_rating})"
+
+
+# --- コンテストごとの部分（キャッシュして受信者間で使い回す） ---
+@lru_cache(maxsize=256)
+def contest_url(contest_id: str) -> str:
+    return f"{ATCODER_URL}/contests/{contest_id}"
+
+
+@lru_cache(maxsize=256)
+def problem_links(contest_id: str) -> str:
+    """A〜G問題へのリンク（Markdown形式）"""
+    base_url = contest_url(contest_id)
+    return " ".join(
+        f"[{letter.upper()}]({base_url}/tasks/{contest_id}_{letter})" for letter in PROBLEM_LETTERS
+    )
+
+
+@lru_cache(maxsize=256)
+def contest_hashtag(contest_id: str, contest_name: str = "") -> str:
+    """コンテストのハッシュタグ（名前があれば「#名前（ID）」の形式）"""
+    if not contest_name:
+        return f"#{contest_id.upper()}"
+    clean_contest_name = re.sub(r'[（）()]', '', contest_name)
+    return f"#{clean_contest_name}（{contest_id.upper()}）"
+
+
+def rating_emoji(rating_change: int) -> str:
+    """レーティング変動に応じた絵文字"""
+    if rating_change > 0:
+        return "🙂"
+    if rating_change < 0:
+        return "😞"
+    return "😐"
+
+
+def format_rating_change(rating_change: int) -> str:
+    """レーティング変動の表示（+51, -10, ±0）"""
+    if rating_change > 0:
+        return f"+{rating_change}"
+    if rating_change < 0:
+        return str(rating_change)
+    return "±0"
@@ -3,10 +3,21 @@ import re
 import sys
 import requests
 import json
+import argparse
 from datetime import datetime, timedelta, timezone
 from bs4 import BeautifulSoup
 from logging import getLogger, StreamHandler, INFO
 
+import atcoder_client
+import contest_calendar
+import delivery_ledger
+import profiling
+import contest_results
+import history_state
+import message_templates
+from roster import load_roster
+import webhook_health
+
 # AtCoderレーティング変動通知スクリプト
 # ユーザーのレーティング変動を検出してDiscordに通知する
 
@@ -23,9 +34,14 @@ ATCODER_USER_ID = os.environ.get("ATCODER_USER_ID")
 DISCORD_WEBHOOK_URLS_NOTIFIER = os.environ.get("DISCORD_WEBHOOK_URLS_NOTIFIER", "")
 
 # --- 定数 ---
-ATCODER_HISTORY_URL = f"https://atcoder.jp/users/{ATCODER_USER_ID}/history"
+ATCODER_HISTORY_URL = f"{atcoder_client.ATCODER_BASE_URL}/users/{ATCODER_USER_ID}/history"
 STATE_FILE = "last_contest.txt"  # 最後に通知したコンテスト情報を保存するファイル
 NOTIFIED_TODAY_FILE = "notified_today.txt"  # その日通知済みかどうかを保存するファイル
+WEBHOOK_HEALTH_FILE = "webhook_health_notifier.json"  # Webhookごとの送信結果を保存するファイル
+DELIVERY_LEDGER_FILE = "delivery_ledger.json"  # 生成済みメッセージとWebhookごとの配信記録
+HISTORY_STATE_FILE = "history_state.json"  # 履歴テーブルのダイジェストと行ごとのフィンガープリント
+DISCORD_MESSAGE_LIMIT = 2000  # Discordの1メッセージの最大文字数
+MESSAGE_SEPARATOR = "\n\n"  # 複数の通知を1通にまとめる場合の区切り
 
 # JST（日本標準時）のタイムゾーン
 JST = timezone(timedelta(hours=9))
@@ -95,16 +111,44 @@ def mark_notified_today():
     logger.info(f"通知済みマークを設定: {current_date}")
 
 
-def get_latest_abc_contest() -> dict | None:
-    """履歴ページから最新のAtCoder Beginner Contestの情報を取得する"""
-    try:
-        res = requests.get(ATCODER_HISTORY_URL)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-    except requests.exceptions.RequestException as e:
-        logger.error(f"履歴ページの取得に失敗しました: {e}")
-        return None
+def read_history_page(res: requests.Response) -> str:
+    """履歴ページのレスポンスからHTMLを取り出す"""
+    res.raise_for_status()
+    return res.text
+
 
+def fetch_history_html() -> str:
+    """履歴ページのHTMLを取得する（同時に同じページを取得する処理があれば結果を共有する）"""
+    return atcoder_client.fetch_shared(ATCODER_HISTORY_URL, read_history_page)
+
+
+def parse_history_page(page_html: str) -> BeautifulSoup:
+    """履歴ページのHTMLをパースする"""
+    with profiling.stage("parse"):
+        return BeautifulSoup(page_html, "html.parser")
+
+
+def should_poll_results() -> bool:
+    """コンテストカレンダーを見て、結果のポーリングを始めてよいか判定する（ネットワークアクセスなし）"""
+    calendar = contest_calendar.load_calendar()
+    if not calendar:
+        # カレンダーがない場合は従来どおり毎回チェックする
+        return True
+
+    running = contest_calendar.find_unfinished_contest(calendar)
+    if running:
+        end_time = datetime.fromtimestamp(contest_calendar.get_end_epoch(running), tz=JST)
+        logger.info(
+            f"コンテスト {running['contest_id']} は開催中です。"
+            f"結果のポーリングは終了時刻 {end_time.strftime('%H:%M')} 以降に開始します。"
+        )
+        return False
+
+    return True
+
+
+def get_latest_abc_contest(soup: BeautifulSoup) -> dict | None:
+    """履歴ページから最新のAtCoder Beginner Contestの情報を取得する"""
     history_table = soup.find("table", {"id": "history"})
     if not history_table:
         logger.info("履歴テーブルが見つかりませんでした。")
@@ -156,14 +200,14 @@ def get_latest_abc_contest() -> dict | None:
     }
 
 
-def check_user_rating_change(contest_id: str) -> dict | None:
+def check_user_rating_change(contest_id: str, soup: BeautifulSoup) -> dict | None:
     """ユーザーの指定コンテストでのレーティング変動を確認する"""
     # 直接共有ページURLを構築してアクセスを試行
-    share_url = f"https://atcoder.jp/users/{ATCODER_USER_ID}/history/share/{contest_id}"
+    share_url = f"{atcoder_client.ATCODER_BASE_URL}/users/{ATCODER_USER_ID}/history/share/{contest_id}"
     
     try:
         logger.info(f"共有ページにアクセス中: {share_url}")
-        res = requests.get(share_url)
+        res = atcoder_client.get(share_url)
         
         # 404の場合はコンテストに参加していない
         if res.status_code == 404:
@@ -173,88 +217,81 @@ def check_user_rating_change(contest_id: str) -> dict | None:
         res.raise_for_status()
         
         # 共有ページが存在する場合、履歴ページからレート変動を取得
-        return get_rating_change_from_history(contest_id, share_url)
+        return get_rating_change_from_history(contest_id, share_url, soup)
         
     except requests.exceptions.RequestException as e:
         logger.error(f"共有ページへのアクセスに失敗しました: {e}")
         return None
 
-def get_rating_change_from_history(contest_id: str, share_url: str) -> dict | None:
+def get_rating_change_from_history(contest_id: str, share_url: str, soup: BeautifulSoup) -> dict | None:
     """履歴ページから指定コンテストのレート変動を取得"""
-    try:
-        res = requests.get(ATCODER_HISTORY_URL)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-
-        history_table = soup.find("table", {"id": "history"})
-        if not history_table:
-            logger.info("履歴テーブルが見つかりませんでした。")
-            return None
-
-        tbody = history_table.find("tbody")
-        if not tbody:
-            logger.info("履歴テーブルのtbodyが見つかりませんでした。")
-            return None
-
-        # 各行をチェックして指定されたコンテストを探す
-        for row in tbody.find_all("tr"):
-            columns = row.find_all("td")
-            if len(columns) >= 7:
-                # コンテスト名から一致するものを探す
-                contest_cell = columns[1]
-                contest_link = contest_cell.find("a")
-                if contest_link and contest_id in contest_link.get("href", ""):
-                    # レート変動を確認
-                    try:
-                        new_rating_text = columns[4].get_text().strip()
-                        rating_change_text = columns[5].get_text().strip()
-
-                        new_rating = (
-                            int(new_rating_text) if new_rating_text != "-" else 0
-                        )
-                        
-                        # 差分から旧レーティングを計算
-                        if rating_change_text != "-":
-                            rating_change = int(rating_change_text.replace("+", ""))
-                            old_rating = new_rating - rating_change
-                        else:
-                            rating_change = 0
-                            old_rating = new_rating
-
-                        logger.info(
-                            f"レート変動: {old_rating} -> {new_rating} (差分: {rating_change})"
-                        )
-
-                        return {
-                            "contest_id": contest_id,
-                            "old_rating": old_rating,
-                            "new_rating": new_rating,
-                            "rating_change": rating_change,
-                            "is_rated": rating_change != 0,
-                            "share_url": share_url,
-                        }
-                    except (ValueError, IndexError) as e:
-                        logger.error(f"レート解析エラー: {e}")
-                        continue
-
-        logger.info(f"履歴テーブルでコンテスト {contest_id} が見つかりませんでした。")
+    history_table = soup.find("table", {"id": "history"})
+    if not history_table:
+        logger.info("履歴テーブルが見つかりませんでした。")
         return None
 
-    except requests.exceptions.RequestException as e:
-        logger.error(f"履歴ページの取得に失敗しました: {e}")
+    tbody = history_table.find("tbody")
+    if not tbody:
+        logger.info("履歴テーブルのtbodyが見つかりませんでした。")
         return None
 
+    # 各行をチェックして指定されたコンテストを探す
+    for row in tbody.find_all("tr"):
+        columns = row.find_all("td")
+        if len(columns) >= 7:
+            # コンテスト名から一致するものを探す
+            contest_cell = columns[1]
+            contest_link = contest_cell.find("a")
+            if contest_link and contest_id in contest_link.get("href", ""):
+                # レート変動を確認
+                try:
+                    new_rating_text = columns[4].get_text().strip()
+                    rating_change_text = columns[5].get_text().strip()
+
+                    new_rating = (
+                        int(new_rating_text) if new_rating_text != "-" else 0
+                    )
+                    
+                    # 差分から旧レーティングを計算
+                    if rating_change_text != "-":
+                        rating_change = int(rating_change_text.replace("+", ""))
+                        old_rating = new_rating - rating_change
+                    else:
+                        rating_change = 0
+                        old_rating = new_rating
+
+                    logger.info(
+                        f"レート変動: {old_rating} -> {new_rating} (差分: {rating_change})"
+                    )
+
+                    return {
+                        "contest_id": contest_id,
+                        "title": contest_link.get_text().strip(),
+                        "old_rating": old_rating,
+                        "new_rating": new_rating,
+                        "rating_change": rating_change,
+                        "is_rated": rating_change != 0,
+                        "share_url": share_url,
+                    }
+                except (ValueError, IndexError) as e:
+                    logger.error(f"レート解析エラー: {e}")
+                    continue
+
+    logger.info(f"履歴テーブルでコンテスト {contest_id} が見つかりませんでした。")
+    return None
+
 
 def scrape_share_page_message(share_url: str) -> str | None:
     """共有ページから通知用のメッセージ本文を抽出する"""
     try:
-        res = requests.get(share_url)
+        res = atcoder_client.get(share_url)
         res.raise_for_status()
     except requests.exceptions.RequestException as e:
         logger.error(f"共有ページの取得に失敗しました: {e}")
         return None
 
-    soup = BeautifulSoup(res.text, "html.parser")
+    with profiling.stage("parse"):
+        soup = BeautifulSoup(res.text, "html.parser")
     panel_body = soup.find("div", class_="panel-body")
     if not panel_body:
         return None
@@ -331,44 +368,39 @@ def parse_contest_result(raw_message: str, contest_info: dict, share_url: str) -
     # 絵文字を選択（レーティング変動に基づく）
     emoji = ""
     if rating_change:
-        change_value = int(rating_change.replace('+', ''))
-        if change_value > 0:
-            emoji = "🙂"
-        elif change_value < 0:
-            emoji = "😞"
-        else:
-            emoji = "😐"
+        emoji = message_templates.rating_emoji(int(rating_change.replace('+', '')))
     
     # メッセージを構築
     message_parts = []
     
     # 1行目：基本成績
     if contest_name and rank:
-        message_parts.append(f"{ATCODER_USER_ID}さんの{contest_name}での成績：{rank}")
+        message_parts.append(message_templates.result_summary(
+            user_id=ATCODER_USER_ID, contest_name=contest_name, rank=rank
+        ))
     
     # 2行目：パフォーマンス
     if performance:
-        message_parts.append(f"パフォーマンス：{performance}相当")
+        message_parts.append(message_templates.result_performance(performance=performance))
     
     # 3行目：レーティング
     if old_rating and new_rating and rating_change:
-        rating_line = f"レーティング：{old_rating}→{new_rating} ({rating_change}) {emoji}"
-        message_parts.append(rating_line)
-    
+        message_parts.append(message_templates.result_rating(
+            old_rating=old_rating, new_rating=new_rating, change_text=rating_change, emoji=emoji
+        ))
     
-    # ハッシュタグとURL
-    contest_hashtag = f"#{contest_info['contest_id'].upper()}"
-    if contest_name:
-        # コンテスト名から適切なハッシュタグを生成
-        clean_contest_name = re.sub(r'[（）()]', '', contest_name)
-        contest_hashtag = f"#{clean_contest_name}（{contest_info['contest_id'].upper()}）"
-    
-    share_url_with_lang = f"{share_url}?lang=ja"
-    message_parts.append(f"#AtCoder {contest_hashtag} {share_url_with_lang}")
+    # ハッシュタグとURL（コンテスト名があればコンテスト名からハッシュタグを生成）
+    contest_hashtag = message_templates.contest_hashtag(contest_info['contest_id'], contest_name)
+    message_parts.append(message_templates.result_footer(hashtag=contest_hashtag, share_url=share_url))
     
     return "\n".join(message_parts)
 
 
+def is_local_url(url: str) -> bool:
+    """ローカルのモックサーバー宛てのURLか（負荷試験用にhttpを許可する）"""
+    return re.match(r'http://(localhost|127\.0\.0\.1)(:\d+)?/', url) is not None
+
+
 def parse_webhook_urls(webhook_urls_str: str) -> list[str]:
     """webhook URL文字列をパースして有効なURLのリストを返す"""
     if not webhook_urls_str:
@@ -378,12 +410,19 @@ def parse_webhook_urls(webhook_urls_str: str) -> list[str]:
     urls = []
     for url in webhook_urls_str.replace(';', ',').replace('\n', ',').split(','):
         url = url.strip()
-        if url and url.startswith('https://'):
+        if url and (url.startswith('https://') or is_local_url(url)):
             urls.append(url)
     
     return urls
 
 
+def deliver_notifications(message: str, webhook_urls: list[str]) -> dict[str, str]:
+    """指定したDiscord Webhookに通知を送信し、Webhookごとの結果を返す"""
+    payload = {"content": message}
+    # 失敗し続けるWebhookはサーキットブレーカーで送信を間引く
+    return webhook_health.deliver(webhook_urls, payload, WEBHOOK_HEALTH_FILE)
+
+
 def send_discord_notifications(message: str) -> bool:
     """複数のDiscord Webhookにレーティング変動通知を送信する"""
     webhook_urls = parse_webhook_urls(DISCORD_WEBHOOK_URLS_NOTIFIER)
@@ -392,17 +431,8 @@ def send_discord_notifications(message: str) -> bool:
         logger.error("有効なDiscord webhook URLが設定されていません。")
         return False
     
-    payload = {"content": message}
-    success_count = 0
-    
-    for i, webhook_url in enumerate(webhook_urls, 1):
-        try:
-            res = requests.post(webhook_url, json=payload, timeout=10)
-            res.raise_for_status()
-            logger.info(f"Discord通知 {i}/{len(webhook_urls)} に成功しました。")
-            success_count += 1
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Discord通知 {i}/{len(webhook_urls)} に失敗しました: {e}")
+    results = deliver_notifications(message, webhook_urls)
+    success_count = sum(status == webhook_health.SENT for status in results.values())
     
     if success_count > 0:
         logger.info(f"Discord通知: {success_count}/{len(webhook_urls)} 件が成功しました。")
@@ -412,6 +442,81 @@ def send_discord_notifications(message: str) -> bool:
         return False
 
 
+def pack_messages(items: list[tuple[str, str, str]]) -> list[list[tuple[str, str, str]]]:
+    """通知を1通あたりDiscordの文字数上限に収まるようにまとめる（1件で上限を超える通知はそのまま1通にする）"""
+    batches = []
+    batch, length = [], 0
+    for item in items:
+        added = len(item[2]) + (len(MESSAGE_SEPARATOR) if batch else 0)
+        if batch and length + added > DISCORD_MESSAGE_LIMIT:
+            batches.append(batch)
+            batch, length = [], 0
+            added = len(item[2])
+        batch.append(item)
+        length += added
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def send_batch_with_ledger(ledger: delivery_ledger.DeliveryLedger, items: list[tuple[str, str, str]]) -> int:
+    """配信記録を使って、複数の通知を未配信のWebhookにだけまとめて送信する
+
+    items は (ユーザーID, コンテストID, メッセージ) のリスト。未配信のWebhookが同じ通知どうしを
+    Discordの文字数上限まで1通にまとめ、配信記録は通知ごとに残す。
+    配信できなかった通知の数を返す（サーキットが開いていて送信を見送っただけの通知は数えない）。
+    """
+    webhook_urls = parse_webhook_urls(DISCORD_WEBHOOK_URLS_NOTIFIER)
+    if not webhook_urls:
+        logger.error("有効なDiscord webhook URLが設定されていません。")
+        return len(items)
+
+    groups: dict[tuple[str, ...], list[tuple[str, str, str]]] = {}
+    for user_id, contest_id, message in items:
+        ledger.record_message(user_id, contest_id, message)
+        targets = ledger.undelivered(user_id, contest_id, webhook_urls)
+        if not targets:
+            logger.info(f"{user_id} の {contest_id} の通知はすべてのWebhookに配信済みです。")
+            continue
+        groups.setdefault(tuple(targets), []).append((user_id, contest_id, message))
+
+    failed = 0
+    for targets, group in groups.items():
+        for batch in pack_messages(group):
+            results = deliver_notifications(MESSAGE_SEPARATOR.join(message for _, _, message in batch), list(targets))
+            for user_id, contest_id, _ in batch:
+                ledger.record_results(user_id, contest_id, results)
+            ledger.save()
+
+            success_count = sum(status == webhook_health.SENT for status in results.values())
+            skipped_count = sum(status == webhook_health.SKIPPED for status in results.values())
+            if success_count < len(targets):
+                logger.info(f"未配信のWebhookは次回の実行で再送します: {len(targets) - success_count} 件")
+            logger.info(f"Discord通知（{len(batch)} 件分）: {success_count}/{len(targets)} 件が成功しました。")
+            # すべてスキップした場合は失敗ではない（サーキットが閉じてから再送する）
+            if success_count == 0 and skipped_count < len(targets):
+                failed += len(batch)
+    return failed
+
+
+def send_with_ledger(ledger: delivery_ledger.DeliveryLedger, user_id: str, contest_id: str, message: str) -> bool:
+    """配信記録を使って未配信のWebhookにだけ通知を送信する
+
+    1件でも配信できた場合と、サーキットが開いていて送信を見送っただけの場合はTrue。
+    """
+    return send_batch_with_ledger(ledger, [(user_id, contest_id, message)]) == 0
+
+
+def retry_pending_deliveries(ledger: delivery_ledger.DeliveryLedger, user_id: str | None = None):
+    """前回配信できなかったWebhookにだけ、生成済みのメッセージを送り直す（user_id省略時は全ユーザー）"""
+    webhook_urls = parse_webhook_urls(DISCORD_WEBHOOK_URLS_NOTIFIER)
+    pending = ledger.pending(webhook_urls, user_id)
+    if not pending:
+        return
+    logger.info(f"未配信の通知を再送します: {len(pending)} 件")
+    send_batch_with_ledger(ledger, [(pending_user_id, contest_id, message) for pending_user_id, contest_id, message, _ in pending])
+
+
 def main():
     """レーティング変動通知のメイン処理"""
     if not ATCODER_USER_ID or not DISCORD_WEBHOOK_URLS_NOTIFIER:
@@ -422,8 +527,31 @@ def main():
 
     logger.info(f"ユーザー '{ATCODER_USER_ID}' のレート更新チェックを開始します。")
 
-    # 1. 最新のAtCoder Beginner Contest情報を取得
-    latest_abc = get_latest_abc_contest()
+    # 前回配信に失敗したWebhookがあれば、生成済みのメッセージをそのWebhookにだけ再送する
+    ledger = delivery_ledger.DeliveryLedger(DELIVERY_LEDGER_FILE)
+    retry_pending_deliveries(ledger, ATCODER_USER_ID)
+
+    # 0. コンテスト終了前は結果が出ないため、履歴ページを取得せずに終了
+    if not should_poll_results():
+        sys.exit(0)
+
+    # 1. 履歴ページを取得し、履歴テーブルが前回と同じならパースせずに終了
+    try:
+        page_html = fetch_history_html()
+    except requests.exceptions.RequestException as e:
+        logger.error(f"履歴ページの取得に失敗しました: {e}")
+        sys.exit(0)
+
+    state = history_state.HistoryState(HISTORY_STATE_FILE, ATCODER_USER_ID)
+    table_html = history_state.extract_history_table(page_html)
+    if table_html is not None and state.is_unchanged(table_html):
+        logger.info("履歴テーブルに変更はありません。処理を終了します。")
+        sys.exit(0)
+    modified_rows = state.modified_rows(table_html) if table_html is not None else {}
+
+    # 2. 最新のAtCoder Beginner Contest情報を取得
+    soup = parse_history_page(page_html)
+    latest_abc = get_latest_abc_contest(soup)
     if not latest_abc:
         logger.info("最新のABC情報が取得できませんでした。")
         sys.exit(0)
@@ -431,94 +559,217 @@ def main():
     latest_contest_id = latest_abc["contest_id"]
     logger.info(f"最新のABC: {latest_contest_id}")
 
-    # 2. 最後に通知したコンテストと比較
+    # 3. 最後に通知したコンテストと比較し、新しいコンテストなら通知する
+    success = True
     last_notified_id = get_last_notified_contest()
     if latest_contest_id == last_notified_id:
-        logger.info("このコンテストは既に処理済みです。処理を終了します。")
-        sys.exit(0)
+        logger.info("このコンテストは既に処理済みです。")
+    else:
+        success = notify_latest_contest(ledger, latest_abc, soup)
+        if success is None:
+            # 参加情報がない場合は状態を更新しない（後で参加情報が現れる可能性があるため）
+            sys.exit(0)
+        modified_rows.pop(latest_contest_id, None)
+
+    # 4. 通知済みのコンテストの行が変わっていれば（レーティングの訂正・Unratedからの変更）再通知する
+    for contest_id, fingerprint in modified_rows.items():
+        if not contest_id.startswith("abc"):
+            continue
+        if notify_corrected_contest(ledger, contest_id, fingerprint, soup) is False:
+            success = False
+
+    # 5. 履歴テーブルの状態を保存する（配信に失敗したWebhookへは配信記録から再送する）
+    if table_html is not None:
+        state.update(table_html)
+        state.save()
 
+    if success:
+        logger.info("処理が正常に完了しました。")
+    else:
+        logger.error("通知の送信に失敗しました。次回の実行で未配信のWebhookにだけ再送します。")
+        sys.exit(1)
+
+
+def create_result_message(contest_info: dict, rating_info: dict) -> str:
+    """共有ページのメッセージから通知メッセージを生成する（取得できなければ代替メッセージ）"""
+    if rating_info["share_url"]:
+        raw_message = scrape_share_page_message(rating_info["share_url"])
+        if raw_message:
+            # 共有ページからメッセージを取得できた場合、理想的なフォーマットに変換
+            with profiling.stage("parse_contest_result"):
+                return parse_contest_result(raw_message, contest_info, rating_info["share_url"])
+    # 共有ページからメッセージを取得できなかった場合・共有URLがない場合の代替メッセージ
+    return create_fallback_message(contest_info, rating_info)
+
+
+def notify_latest_contest(ledger: delivery_ledger.DeliveryLedger, latest_abc: dict, soup: BeautifulSoup) -> bool | None:
+    """新しいコンテストの結果を通知する（参加情報が見つからなければNone）"""
+    latest_contest_id = latest_abc["contest_id"]
     logger.info(f"新しいコンテスト結果をチェックします: {latest_contest_id}")
 
-    # 3. ユーザーの該当コンテストでのレート変動を確認
-    rating_info = check_user_rating_change(latest_contest_id)
+    # ユーザーの該当コンテストでのレート変動を確認
+    rating_info = check_user_rating_change(latest_contest_id, soup)
     if not rating_info:
         logger.info(
             f"コンテスト {latest_contest_id} での参加情報が見つかりませんでした。"
         )
-        # 参加情報がない場合は状態を更新しない（後で参加情報が現れる可能性があるため）
-        sys.exit(0)
+        return None
 
-    # 4. レート変動の確認とログ出力
+    # レート変動の確認とログ出力
     if not rating_info["is_rated"]:
         logger.info("レート変動がありませんでしたが、通知を送信します。")
     else:
         logger.info(f"レート変動が検出されました: {rating_info['rating_change']}")
 
-    # 4.5. 通知処理を開始（このコンテストは未処理のため通知する）
-    logger.info("新しいコンテスト結果のため通知を送信します。")
-
-    # 5. 状態を更新する（重複通知を防ぐため）
+    # 状態を更新する（重複通知を防ぐため）
     save_last_notified_contest(latest_contest_id)
     mark_notified_today()  # 今日通知済みとしてマーク
 
-    # 6. 通知メッセージを生成
-    if rating_info["share_url"]:
-        raw_message = scrape_share_page_message(rating_info["share_url"])
-        if raw_message:
-            # 共有ページからメッセージを取得できた場合、理想的なフォーマットに変換
-            final_message = parse_contest_result(raw_message, latest_abc, rating_info["share_url"])
-        else:
-            # 共有ページからメッセージを取得できなかった場合の代替メッセージ
-            final_message = create_fallback_message(latest_abc, rating_info)
-    else:
-        # 共有URLがない場合の代替メッセージ
-        final_message = create_fallback_message(latest_abc, rating_info)
+    # Discordに通知（配信記録に残し、失敗したWebhookは次回の実行で再送する）
+    final_message = create_result_message(latest_abc, rating_info)
+    return send_with_ledger(ledger, ATCODER_USER_ID, latest_contest_id, final_message)
 
-    # 7. Discordに通知
-    success = send_discord_notifications(final_message)
-    if success:
-        logger.info("処理が正常に完了しました。")
-    else:
-        logger.error("通知の送信に失敗しました。")
-        # 通知に失敗した場合は状態を元に戻す（再試行可能にするため）
-        if last_notified_id:
-            save_last_notified_contest(last_notified_id)
-        else:
-            # 初回実行時など、前回の状態がない場合はファイルを削除
-            if os.path.exists(STATE_FILE):
-                os.remove(STATE_FILE)
-        sys.exit(1)
+
+def notify_corrected_contest(
+    ledger: delivery_ledger.DeliveryLedger, contest_id: str, fingerprint: str, soup: BeautifulSoup
+) -> bool | None:
+    """通知済みのコンテストの結果が変わった場合に再通知する（行が見つからなければNone）"""
+    logger.info(f"コンテスト {contest_id} の履歴が更新されました。")
+    share_url = f"{atcoder_client.ATCODER_BASE_URL}/users/{ATCODER_USER_ID}/history/share/{contest_id}"
+    rating_info = get_rating_change_from_history(contest_id, share_url, soup)
+    if not rating_info:
+        return None
+
+    contest_info = {"contest_id": contest_id, "title": rating_info["title"]}
+    message = "\n".join([
+        message_templates.result_updated(contest_name=rating_info["title"]),
+        create_result_message(contest_info, rating_info),
+    ])
+    # 訂正のたびに別の通知として配信記録に残す（行のフィンガープリントで区別する）
+    return send_with_ledger(ledger, ATCODER_USER_ID, f"{contest_id}#{fingerprint}", message)
 
 
 def create_fallback_message(contest_info: dict, rating_info: dict) -> str:
     """共有ページが利用できない場合の代替メッセージを生成"""
     rating_change = rating_info["rating_change"]
-    
-    # 絵文字を選択
-    emoji = ""
-    if rating_change > 0:
-        emoji = "🙂"
-        change_text = f"+{rating_change}"
-    elif rating_change < 0:
-        emoji = "😞"
-        change_text = str(rating_change)
-    else:
-        emoji = "😐"
-        change_text = "±0"
+    contest_hashtag = message_templates.contest_hashtag(contest_info["contest_id"])
     
     # 理想的なフォーマットに近い形で生成
     message_parts = [
-        f"{ATCODER_USER_ID}さんの{contest_info['title']}に参加しました！",
-        f"レーティング：{rating_info['old_rating']}→{rating_info['new_rating']} ({change_text}) {emoji}",
-        f"#AtCoder #{contest_info['contest_id'].upper()}"
+        message_templates.result_fallback_summary(user_id=ATCODER_USER_ID, contest_name=contest_info["title"]),
+        message_templates.result_rating(
+            old_rating=rating_info["old_rating"],
+            new_rating=rating_info["new_rating"],
+            change_text=message_templates.format_rating_change(rating_change),
+            emoji=message_templates.rating_emoji(rating_change),
+        ),
     ]
     
     if rating_info.get("share_url"):
-        share_url_with_lang = f"{rating_info['share_url']}?lang=ja"
-        message_parts[-1] += f" {share_url_with_lang}"
+        message_parts.append(message_templates.result_footer(hashtag=contest_hashtag, share_url=rating_info["share_url"]))
+    else:
+        message_parts.append(message_templates.result_footer(hashtag=contest_hashtag))
     
     return "\n".join(message_parts)
 
 
+def create_roster_result_message(result: dict, contest_id: str) -> str:
+    """コンテスト結果JSONの1人分から通知メッセージを生成する"""
+    user_id = result["user_id"]
+    contest_name = result["contest_name"] or contest_id.upper()
+    message_parts = [
+        message_templates.result_summary(user_id=user_id, contest_name=contest_name, rank=f"{result['place']}位"),
+        message_templates.result_performance(performance=result["performance"]),
+    ]
+
+    if result["is_rated"]:
+        rating_change = result["rating_change"]
+        message_parts.append(message_templates.result_rating(
+            old_rating=result["old_rating"],
+            new_rating=result["new_rating"],
+            change_text=message_templates.format_rating_change(rating_change),
+            emoji=message_templates.rating_emoji(rating_change),
+        ))
+
+    share_url = f"{atcoder_client.ATCODER_BASE_URL}/users/{user_id}/history/share/{contest_id}"
+    message_parts.append(message_templates.result_footer(
+        hashtag=message_templates.contest_hashtag(contest_id, contest_name), share_url=share_url
+    ))
+    return "\n".join(message_parts)
+
+
+def main_roster(contest_id: str | None = None):
+    """ロスターモード: コンテスト結果JSONを1回だけ取得して全員のレーティング変動を通知する"""
+    user_ids = load_roster()
+    if not user_ids or not DISCORD_WEBHOOK_URLS_NOTIFIER:
+        logger.error(
+            "環境変数 ATCODER_USER_IDS（または ATCODER_USER_ID）と DISCORD_WEBHOOK_URLS_NOTIFIER を設定してください。"
+        )
+        sys.exit(1)
+
+    logger.info(f"ロスター {len(user_ids)} 人のレート更新チェックを開始します。")
+
+    # 前回配信に失敗したWebhookがあれば、生成済みのメッセージをそのWebhookにだけ再送する
+    ledger = delivery_ledger.DeliveryLedger(DELIVERY_LEDGER_FILE)
+    retry_pending_deliveries(ledger)
+
+    # 1. 対象コンテストを決める（指定がなければカレンダー上で最後に終了したABC）
+    if not contest_id:
+        if not should_poll_results():
+            sys.exit(0)
+        calendar = contest_calendar.load_calendar()
+        latest = contest_calendar.find_latest_ended_contest(calendar) if calendar else None
+        if not latest:
+            logger.info("終了したABCがカレンダーにありません。--contest で指定してください。")
+            sys.exit(0)
+        contest_id = latest["contest_id"]
+
+    # 2. 通知済みのユーザーを除く（全員処理済みならネットワークアクセスなしで終了）
+    pending_user_ids = [u for u in user_ids if not ledger.has_message(u, contest_id)]
+    if not pending_user_ids:
+        logger.info(f"コンテスト {contest_id} はロスター全員について処理済みです。")
+        sys.exit(0)
+
+    # 3. 結果JSONを1回だけ取得して、ロスターのユーザーを照合する
+    results = contest_results.fetch_roster_results(contest_id, pending_user_ids)
+    if results is None:
+        sys.exit(0)
+
+    # 4. 見つかったユーザーの通知を、Discordのレート制限に当たらないよう数人分ずつ1通にまとめて送る
+    items = [
+        (user_id, contest_id, create_roster_result_message(results[user_id], contest_id))
+        for user_id in pending_user_ids if user_id in results
+    ]
+    failed = send_batch_with_ledger(ledger, items)
+
+    # 5. 結果を最後まで照合しても見つからなかったユーザーは不参加として記録し、次回から結果JSONを取得しない
+    absent_user_ids = [u for u in pending_user_ids if u not in results]
+    if absent_user_ids:
+        for user_id in absent_user_ids:
+            ledger.record_absent(user_id, contest_id)
+        ledger.save()
+        logger.info(f"コンテスト {contest_id} に参加していないユーザーを記録しました: {len(absent_user_ids)} 人")
+
+    if failed:
+        logger.error(f"{failed} 人分の通知の送信に失敗しました。次回の実行で未配信のWebhookにだけ再送します。")
+        sys.exit(1)
+    logger.info("処理が正常に完了しました。")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="AtCoderレーティング変動通知")
+    parser.add_argument("--roster", action="store_true", help="ロスター全員の結果をコンテスト結果JSONから一括で取得する")
+    parser.add_argument("--contest", help="ロスターモードで対象にするコンテストID（例: abc413）")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
+    args = parse_args(profiling.enable_from_args(sys.argv[1:]))
+    try:
+        if args.roster:
+            main_roster(args.contest)
+        else:
+            main()
+    finally:
+        atcoder_client.log_metrics()
+        profiling.write_reports()
@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import argparse
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from logging import getLogger, StreamHandler, INFO
+
+# 処理段階（取得・パース・メッセージ生成・Webhook送信）ごとのプロファイリング
+# --profile を指定した場合だけ、各段階をcProfileとtracemallocで計測してレポートを書き出す
+
+# ロガーの設定
+logger = getLogger(__name__)
+handler = StreamHandler(sys.stdout)
+handler.setLevel(INFO)
+logger.addHandler(handler)
+logger.setLevel(INFO)
+
+# --- 定数 ---
+DEFAULT_PROFILE_DIR = "profile"
+REPORT_LINES = 40  # レポートに載せる関数・割り当て箇所の数
+
+# 出力先（Noneの場合はプロファイリング無効）
+_output_dir: str | None = None
+# 段階ごとのプロファイラと計測値
+_profiles: dict[str, cProfile.Profile] = {}
+_stages: dict[str, dict] = {}
+# cProfileは同時に1つしか有効にできないため、入れ子・並行の段階は計測しない
+_active_lock = threading.Lock()
+
+
+def enable(output_dir: str):
+    """プロファイリングを有効にする"""
+    global _output_dir
+    _output_dir = output_dir
+    os.makedirs(output_dir, exist_ok=True)
+    tracemalloc.start()
+    logger.info(f"プロファイリングを有効にしました: {output_dir}")
+
+
+def enable_from_args(argv: list[str]) -> list[str]:
+    """コマンドライン引数の --profile [DIR] を処理し、残りの引数を返す"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_PROFILE_DIR, default=None)
+    args, rest = parser.parse_known_args(argv)
+    if args.profile:
+        enable(args.profile)
+    return rest
+
+
+@contextmanager
+def stage(name: str):
+    """処理段階をcProfileとtracemallocで計測する（無効時は何もしない）"""
+    if _output_dir is None or not _active_lock.acquire(blocking=False):
+        yield
+        return
+
+    profile = _profiles.setdefault(name, cProfile.Profile())
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started_at = time.perf_counter()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        elapsed = time.perf_counter() - started_at
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+
+        record = _stages.setdefault(name, {"calls": 0, "seconds": 0.0, "peak_bytes": 0, "top_allocations": []})
+        record["calls"] += 1
+        record["seconds"] += elapsed
+        if peak >= record["peak_bytes"]:
+            # 最もメモリを使った呼び出しの割り当て箇所を残す
+            record["peak_bytes"] = peak
+            snapshot = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            ])
+            record["top_allocations"] = [str(stat) for stat in snapshot.statistics("lineno")[:REPORT_LINES]]
+        _active_lock.release()
+
+
+def write_reports():
+    """段階ごとのcProfileレポートとメモリ使用量のまとめを書き出す"""
+    if _output_dir is None or not _stages:
+        return
+
+    summary_lines = [f"{'stage':<24}{'calls':>8}{'seconds':>12}{'peak KiB':>12}"]
+    for name, record in sorted(_stages.items(), key=lambda item: -item[1]["seconds"]):
+        profile = _profiles[name]
+        profile.dump_stats(os.path.join(_output_dir, f"{name}.prof"))
+        with open(os.path.join(_output_dir, f"{name}.txt"), "w") as f:
+            stats = pstats.Stats(profile, stream=f)
+            stats.sort_stats("cumulative").print_stats(REPORT_LINES)
+            stats.sort_stats("tottime").print_stats(REPORT_LINES)
+            f.write(f"\nPeak allocation: {record['peak_bytes'] / 1024:.1f} KiB\n")
+            f.write("\n".join(record["top_allocations"]) + "\n")
+
+        summary_lines.append(
+            f"{name:<24}{record['calls']:>8}{record['seconds']:>12.3f}{record['peak_bytes'] / 1024:>12.1f}"
+        )
+
+    summary = "\n".join(summary_lines)
+    with open(os.path.join(_output_dir, "summary.txt"), "w") as f:
+        f.write(summary + "\n")
+    logger.info(f"プロファイル結果を書き出しました: {_output_dir}\n{summary}")
@@ -0,0 +1,250 @@
+import sys
+import requests
+import numpy as np
+from datetime import datetime
+from logging import getLogger, StreamHandler, INFO
+
+import atcoder_client
+import message_templates
+from roster import load_roster
+
+# AtCoderロスター全体のレーティング統計・リーダーボード生成スクリプト
+# 監視対象ユーザー全員の履歴をNumPy配列にまとめ、コンテスト後の集計をバッチで計算する
+
+# ロガーの設定
+logger = getLogger(__name__)
+handler = StreamHandler(sys.stdout)
+handler.setLevel(INFO)
+logger.addHandler(handler)
+logger.setLevel(INFO)
+
+# --- 定数 ---
+ATCODER_HISTORY_JSON_URL = atcoder_client.ATCODER_BASE_URL + "/users/{user_id}/history/json"
+
+# 色の境界（レーティング）と色名
+RATING_COLOR_BOUNDS = np.array([400, 800, 1200, 1600, 2000, 2400, 2800])
+RATING_COLOR_NAMES = ["灰", "茶", "緑", "水", "青", "黄", "橙", "赤"]
+
+# リーダーボードに載せる人数の上限
+LEADERBOARD_SIZE = 5
+# 列挙する名前の上限（超えた分は「他N人」にまとめる）
+MAX_LISTED_NAMES = 10
+# Discordのメッセージ長上限
+DISCORD_MESSAGE_LIMIT = 2000
+
+
+def fetch_user_history(user_id: str) -> list[dict] | None:
+    """ユーザーのコンテスト履歴をJSONで取得する"""
+    url = ATCODER_HISTORY_JSON_URL.format(user_id=user_id)
+    try:
+        res = atcoder_client.get(url, timeout=10)
+        res.raise_for_status()
+        return res.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.error(f"{user_id} の履歴JSONの取得に失敗しました: {e}")
+        return None
+
+
+def load_roster_histories(user_ids: list[str]) -> dict[str, list[dict]]:
+    """ロスター全員の履歴を取得する（取得できなかったユーザーは除外）"""
+    histories = {}
+    for user_id in user_ids:
+        history = fetch_user_history(user_id)
+        if history is not None:
+            histories[user_id] = history
+    logger.info(f"履歴を取得しました: {len(histories)}/{len(user_ids)} 人")
+    return histories
+
+
+def build_history_arrays(histories: dict[str, list[dict]]) -> dict:
+    """ロスター全員の履歴を1本の列指向NumPy配列にまとめる"""
+    user_ids = list(histories)
+    entries = [
+        (user_index, entry)
+        for user_index, user_id in enumerate(user_ids)
+        for entry in histories[user_id]
+    ]
+
+    return {
+        "user_ids": np.array(user_ids, dtype=object),
+        "user_index": np.fromiter((i for i, _ in entries), dtype=np.int32, count=len(entries)),
+        # "abc413.contest.atcoder.jp" から "abc413" を取り出す
+        "contest_id": np.array(
+            [e.get("ContestScreenName", "").split(".")[0] for _, e in entries], dtype=str
+        ),
+        "contest_name": np.array([e.get("ContestName", "") for _, e in entries], dtype=object),
+        "end_epoch": np.fromiter(
+            (int(datetime.fromisoformat(e["EndTime"]).timestamp()) if e.get("EndTime") else 0
+             for _, e in entries),
+            dtype=np.int64, count=len(entries),
+        ),
+        "is_rated": np.fromiter((bool(e.get("IsRated")) for _, e in entries), dtype=bool, count=len(entries)),
+        "place": np.fromiter((e.get("Place", 0) for _, e in entries), dtype=np.int32, count=len(entries)),
+        "old_rating": np.fromiter((e.get("OldRating", 0) for _, e in entries), dtype=np.int32, count=len(entries)),
+        "new_rating": np.fromiter((e.get("NewRating", 0) for _, e in entries), dtype=np.int32, count=len(entries)),
+        "performance": np.fromiter((e.get("Performance", 0) for _, e in entries), dtype=np.int32, count=len(entries)),
+    }
+
+
+def find_latest_contest(arrays: dict, prefix: str = "abc") -> str | None:
+    """ロスター内で最も新しいRatedコンテスト（既定はABC）のIDを返す"""
+    contest_ids = arrays["contest_id"]
+    mask = arrays["is_rated"] & np.char.startswith(contest_ids, prefix)
+    if not mask.any():
+        return None
+    rows = np.flatnonzero(mask)
+    return str(contest_ids[rows[np.argmax(arrays["end_epoch"][rows])]])
+
+
+def rating_color_index(ratings: np.ndarray) -> np.ndarray:
+    """レーティング配列を色のインデックス配列に変換する"""
+    return np.searchsorted(RATING_COLOR_BOUNDS, ratings, side="right")
+
+
+def compute_contest_stats(arrays: dict, contest_id: str) -> dict | None:
+    """指定コンテストのロスター集計（中央値・上昇ランキング・自己ベスト・色変）を計算する"""
+    target = arrays["is_rated"] & (arrays["contest_id"] == contest_id)
+    if not target.any():
+        logger.info(f"コンテスト {contest_id} のRated参加者がロスター内にいません。")
+        return None
+
+    rows = np.flatnonzero(target)
+    user_index = arrays["user_index"][rows]
+    old_rating = arrays["old_rating"][rows]
+    new_rating = arrays["new_rating"][rows]
+    performance = arrays["performance"][rows]
+    delta = new_rating - old_rating
+    contest_end = arrays["end_epoch"][rows].max()
+
+    # 対象コンテストより前の最高レーティングをユーザーごとに求める
+    # （初めてのRated参加は比較対象がないため自己ベスト更新に数えない）
+    previous = arrays["is_rated"] & (arrays["end_epoch"] < contest_end)
+    previous_highest = np.zeros(len(arrays["user_ids"]), dtype=np.int32)
+    np.maximum.at(previous_highest, arrays["user_index"][previous], arrays["new_rating"][previous])
+    has_previous = np.zeros(len(arrays["user_ids"]), dtype=bool)
+    has_previous[arrays["user_index"][previous]] = True
+    is_new_highest = has_previous[user_index] & (new_rating > previous_highest[user_index])
+
+    # 色の境界をまたいだユーザー
+    old_color = rating_color_index(old_rating)
+    new_color = rating_color_index(new_rating)
+    crossed = (old_color != new_color) & (old_rating > 0)
+
+    # 上昇量の降順（同値は順位の昇順）
+    order = np.lexsort((arrays["place"][rows], -delta))[:LEADERBOARD_SIZE]
+
+    user_ids = arrays["user_ids"]
+    return {
+        "contest_id": contest_id,
+        "contest_name": arrays["contest_name"][rows[0]],
+        "participants": len(rows),
+        "median_performance": int(np.median(performance)),
+        "top_gainers": [
+            {
+                "user_id": user_ids[user_index[i]],
+                "old_rating": int(old_rating[i]),
+                "new_rating": int(new_rating[i]),
+                "rating_change": int(delta[i]),
+            }
+            for i in order
+        ],
+        "new_highests": list(user_ids[user_index[is_new_highest]]),
+        "color_changes": [
+            {
+                "user_id": user_ids[user_index[i]],
+                "old_color": RATING_COLOR_NAMES[old_color[i]],
+                "new_color": RATING_COLOR_NAMES[new_color[i]],
+                "is_up": bool(new_color[i] > old_color[i]),
+            }
+            for i in np.flatnonzero(crossed)
+        ],
+    }
+
+
+def format_name_list(names: list[str]) -> str:
+    """名前のリストを上限付きで連結する"""
+    if len(names) <= MAX_LISTED_NAMES:
+        return ", ".join(names)
+    return ", ".join(names[:MAX_LISTED_NAMES]) + f" 他{len(names) - MAX_LISTED_NAMES}人"
+
+
+def create_leaderboard_message(stats: dict) -> str:
+    """集計結果からリーダーボードのメッセージを生成する"""
+    message_parts = [
+        message_templates.leaderboard_header(
+            contest_name=stats["contest_name"], participants=stats["participants"]
+        ),
+        message_templates.leaderboard_median(median_performance=stats["median_performance"]),
+    ]
+
+    if stats["top_gainers"]:
+        message_parts.append("📈 上昇ランキング")
+        for rank, gainer in enumerate(stats["top_gainers"], 1):
+            message_parts.append(message_templates.leaderboard_gainer(
+                rank=rank,
+                user_id=gainer["user_id"],
+                change_text=message_templates.format_rating_change(gainer["rating_change"]),
+                old_rating=gainer["old_rating"],
+                new_rating=gainer["new_rating"],
+            ))
+
+    if stats["new_highests"]:
+        message_parts.append(f"🏆 自己ベスト更新：{format_name_list(stats['new_highests'])}")
+
+    ups = [c for c in stats["color_changes"] if c["is_up"]]
+    downs = [c for c in stats["color_changes"] if not c["is_up"]]
+    if ups:
+        message_parts.append(
+            "🎨 色変：" + format_name_list([f"{c['user_id']} {c['old_color']}→{c['new_color']}" for c in ups])
+        )
+    if downs:
+        message_parts.append(
+            "🔻 色落ち：" + format_name_list([f"{c['user_id']} {c['old_color']}→{c['new_color']}" for c in downs])
+        )
+
+    message_parts.append(message_templates.result_footer(
+        hashtag=message_templates.contest_hashtag(stats["contest_id"])
+    ))
+
+    message = "\n".join(message_parts)
+    if len(message) > DISCORD_MESSAGE_LIMIT:
+        message = message[:DISCORD_MESSAGE_LIMIT - 1] + "…"
+    return message
+
+
+def main():
+    """ロスター集計のメイン処理"""
+    user_ids = load_roster()
+    if not user_ids:
+        logger.error("環境変数 ATCODER_USER_IDS / ATCODER_USER_ID が設定されていません。")
+        sys.exit(1)
+
+    histories = load_roster_histories(user_ids)
+    if not histories:
+        logger.info("履歴を取得できたユーザーがいません。")
+        sys.exit(0)
+
+    arrays = build_history_arrays(histories)
+    contest_id = sys.argv[1] if len(sys.argv) > 1 else find_latest_contest(arrays)
+    if not contest_id:
+        logger.info("集計対象のコンテストが見つかりませんでした。")
+        sys.exit(0)
+
+    stats = compute_contest_stats(arrays, contest_id)
+    if not stats:
+        sys.exit(0)
+
+    message = create_leaderboard_message(stats)
+    logger.info(message)
+
+    # 通知先が設定されている場合のみDiscordに送信
+    from notifier import DISCORD_WEBHOOK_URLS_NOTIFIER, send_discord_notifications
+    if DISCORD_WEBHOOK_URLS_NOTIFIER and not send_discord_notifications(message):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        atcoder_client.log_metrics()
@@ -4,7 +4,13 @@ import requests
 import re
 from bs4 import BeautifulSoup
 from logging import getLogger, StreamHandler, INFO
-from datetime import datetime, timezone, timedelta
+
+import atcoder_client
+import contest_calendar
+import webhook_health
+import profiling
+import message_templates
+from contest_time import from_epoch, parse_contest_time
 
 # ロガーの設定
 logger = getLogger(__name__)
@@ -18,66 +24,16 @@ logger.setLevel(INFO)
 DISCORD_WEBHOOK_URLS_REMINDER = os.environ.get("DISCORD_WEBHOOK_URLS_REMINDER", "")
 
 # --- 定数 ---
-ATCODER_CONTESTS_URL = "https://atcoder.jp/contests/"
+ATCODER_CONTESTS_URL = f"{atcoder_client.ATCODER_BASE_URL}/contests/"
+DEFAULT_DURATION_SECOND = 6000  # 100分 = 6000秒（コンテスト時間が取得できない場合）
+WEBHOOK_HEALTH_FILE = "webhook_health_reminder.json"  # Webhookごとの送信結果を保存するファイル
 
 
-def get_latest_abc_contest() -> dict | None:
-    """AtCoderコンテスト一覧ページから最新のABCコンテストの情報を取得する"""
+def fetch_upcoming_abc_contests() -> list[dict] | None:
+    """AtCoderコンテスト一覧ページから開催予定のABCコンテストをすべて取得する（失敗時はNone）"""
     try:
-        res = requests.get(ATCODER_CONTESTS_URL, timeout=10)
-        res.raise_for_status()
-        
-        soup = BeautifulSoup(res.content, 'html.parser')
-        
-        # 開催予定のコンテストテーブルを探す
-        upcoming_table = soup.find('div', id='contest-table-upcoming')
-        if not upcoming_table:
-            logger.error("開催予定のコンテストテーブルが見つかりませんでした。")
-            return None
-            
-        table = upcoming_table.find('table')
-        if not table:
-            logger.error("コンテストテーブルが見つかりませんでした。")
-            return None
-        
-        tbody = table.find('tbody')
-        if not tbody:
-            logger.error("テーブルボディが見つかりませんでした。")
-            return None
-            
-        rows = tbody.find_all('tr')
-        
-        for row in rows:
-            cells = row.find_all('td')
-            if len(cells) >= 2:
-                # コンテスト名のリンクを取得
-                contest_link = cells[1].find('a')
-                if contest_link:
-                    contest_name = contest_link.get_text(strip=True)
-                    contest_url = contest_link.get('href')
-                    
-                    # ABCコンテストかチェック
-                    if re.search(r'AtCoder Beginner Contest \d+|ABC\d+', contest_name, re.IGNORECASE):
-                        # 日時を取得
-                        date_cell = cells[0].get_text(strip=True)
-                        contest_id = contest_url.split('/')[-1] if contest_url else None
-                        
-                        # 日時をパースしてepoch時間に変換
-                        start_epoch = parse_contest_date_to_epoch(date_cell)
-                        
-                        logger.info(f"最新のABC: {contest_id} ({contest_name})")
-                        
-                        return {
-                            "contest_id": contest_id,
-                            "title": contest_name,
-                            "start_epoch_second": start_epoch,
-                            "duration_second": 6000,  # 100分 = 6000秒（デフォルト）
-                            "date_str": date_cell,
-                            "contest_url": f"https://atcoder.jp{contest_url}" if contest_url else None
-                        }
-        
-        logger.info("開催予定のABCコンテストが見つかりませんでした。")
-        return None
+        # 同時に同じページを取得する処理があれば、取得とパースを共有する
+        return atcoder_client.fetch_shared(ATCODER_CONTESTS_URL, parse_upcoming_abc_contests, timeout=10)
         
     except requests.exceptions.RequestException as e:
         logger.error(f"コンテスト情報の取得に失敗しました: {e}")
@@ -87,41 +43,82 @@ def get_latest_abc_contest() -> dict | None:
         return None
 
 
-def parse_contest_date_to_epoch(date_str: str) -> int:
-    """コンテスト日時文字列をepoch時間に変換"""
-    try:
-        # パターン1: "2025-07-12(土) 21:00" の形式をパース
-        date_match = re.search(r'(\d{4}-\d{2}-\d{2})\([^)]+\)\s+(\d{1,2}):(\d{2})', date_str)
-        if date_match:
-            date_part = date_match.group(1)
-            hour = int(date_match.group(2))
-            minute = int(date_match.group(3))
-            
-            # JST timezone
-            jst = timezone(timedelta(hours=9))
-            contest_datetime = datetime.strptime(f"{date_part} {hour:02d}:{minute:02d}", '%Y-%m-%d %H:%M')
-            contest_datetime = contest_datetime.replace(tzinfo=jst)
-            
-            return int(contest_datetime.timestamp())
+def parse_upcoming_abc_contests(res: requests.Response) -> list[dict] | None:
+    """コンテスト一覧ページのレスポンスから開催予定のABCコンテストを開始順に抽出する"""
+    res.raise_for_status()
+    
+    with profiling.stage("parse"):
+        soup = BeautifulSoup(res.content, 'html.parser')
+    
+    # 開催予定のコンテストテーブルを探す
+    upcoming_table = soup.find('div', id='contest-table-upcoming')
+    if not upcoming_table:
+        logger.error("開催予定のコンテストテーブルが見つかりませんでした。")
+        return None
         
-        # パターン2: "2025-07-12 21:00:00+0900" の形式をパース
-        iso_match = re.search(r'(\d{4}-\d{2}-\d{2})\s+(\d{1,2}):(\d{2}):\d{2}[+-]\d{4}', date_str)
-        if iso_match:
-            date_part = iso_match.group(1)
-            hour = int(iso_match.group(2))
-            minute = int(iso_match.group(3))
-            
-            # JST timezone
-            jst = timezone(timedelta(hours=9))
-            contest_datetime = datetime.strptime(f"{date_part} {hour:02d}:{minute:02d}", '%Y-%m-%d %H:%M')
-            contest_datetime = contest_datetime.replace(tzinfo=jst)
-            
-            return int(contest_datetime.timestamp())
-            
-    except Exception as e:
-        logger.warning(f"日時のパースに失敗しました: {date_str}, エラー: {e}")
+    table = upcoming_table.find('table')
+    if not table:
+        logger.error("コンテストテーブルが見つかりませんでした。")
+        return None
+    
+    tbody = table.find('tbody')
+    if not tbody:
+        logger.error("テーブルボディが見つかりませんでした。")
+        return None
         
-    return 0
+    contests = []
+    rows = tbody.find_all('tr')
+    
+    for row in rows:
+        cells = row.find_all('td')
+        if len(cells) >= 2:
+            # コンテスト名のリンクを取得
+            contest_link = cells[1].find('a')
+            if contest_link:
+                contest_name = contest_link.get_text(strip=True)
+                contest_url = contest_link.get('href')
+                
+                # ABCコンテストかチェック
+                if re.search(r'AtCoder Beginner Contest \d+|ABC\d+', contest_name, re.IGNORECASE):
+                    # 日時を取得
+                    date_cell = cells[0].get_text(strip=True)
+                    contest_id = contest_url.split('/')[-1] if contest_url else None
+                    
+                    # コンテスト時間（"01:40" 形式）を取得
+                    duration = DEFAULT_DURATION_SECOND
+                    if len(cells) >= 3:
+                        duration = parse_duration_to_seconds(cells[2].get_text(strip=True))
+                    
+                    # 日時を1回だけパースして開始・終了時刻を計算（結果はメモ化され、表示時にも再利用される）
+                    contest_time = parse_contest_time(date_cell, duration)
+                    if not contest_time:
+                        logger.warning(f"日時のパースに失敗しました: {date_cell}")
+                    
+                    contests.append({
+                        "contest_id": contest_id,
+                        "title": contest_name,
+                        "start_epoch_second": contest_time.start_epoch if contest_time else 0,
+                        "duration_second": duration,
+                        "end_epoch_second": contest_time.end_epoch if contest_time else 0,
+                        "date_str": date_cell,
+                        "contest_url": f"https://atcoder.jp{contest_url}" if contest_url else None
+                    })
+    
+    if not contests:
+        logger.info("開催予定のABCコンテストが見つかりませんでした。")
+    return contests
+
+
+def parse_duration_to_seconds(duration_str: str) -> int:
+    """コンテスト時間の文字列（例: "01:40", "240:00"）を秒に変換"""
+    duration_match = re.fullmatch(r'(\d+):(\d{2})', duration_str.strip())
+    if not duration_match:
+        logger.warning(f"コンテスト時間のパースに失敗しました: {duration_str}")
+        return DEFAULT_DURATION_SECOND
+    
+    hours = int(duration_match.group(1))
+    minutes = int(duration_match.group(2))
+    return (hours * 60 + minutes) * 60
 
 
 def format_contest_time_discord(start_epoch: int, duration: int) -> str:
@@ -129,130 +126,35 @@ def format_contest_time_discord(start_epoch: int, duration: int) -> str:
     if start_epoch == 0:
         return "開催時間未定"
     
-    end_epoch = start_epoch + duration
-    
     # Discordタイムスタンプ形式: <t:epoch:f> (full format)
-    return f"<t:{start_epoch}:f> - <t:{end_epoch}:t>"
+    return from_epoch(start_epoch, duration).discord
 
 def format_contest_time(start_epoch: int, duration: int) -> str:
     """コンテスト開始時刻と終了時刻を日本時間でフォーマット"""
     if start_epoch == 0:
         return "開催時間未定"
     
-    # JST timezone
-    jst = timezone(timedelta(hours=9))
-    
-    start_time = datetime.fromtimestamp(start_epoch, tz=jst)
-    end_time = start_time + timedelta(seconds=duration)
-    
-    # 曜日を追加
-    weekdays = ['月', '火', '水', '木', '金', '土', '日']
-    weekday = weekdays[start_time.weekday()]
-    
-    return f"{start_time.strftime('%Y/%m/%d')}({weekday}) {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}"
+    return from_epoch(start_epoch, duration).display
 
 
-def format_date_string_discord(date_str: str) -> str:
+def format_date_string_discord(date_str: str, duration: int = DEFAULT_DURATION_SECOND) -> str:
     """アtCoderから取得した日時文字列をDiscordタイムスタンプ形式に変換"""
-    try:
-        # パターン1: "2025-07-12(土) 21:00" 形式
-        date_match = re.search(r'(\d{4}-\d{2}-\d{2})\(([^)]+)\)\s+(\d{1,2}):(\d{2})', date_str)
-        if date_match:
-            date_part = date_match.group(1)
-            hour = int(date_match.group(3))
-            minute = int(date_match.group(4))
-            
-            # JST timezone
-            jst = timezone(timedelta(hours=9))
-            year, month, day = map(int, date_part.split('-'))
-            contest_start = datetime(year, month, day, hour, minute, tzinfo=jst)
-            contest_end = contest_start + timedelta(minutes=100)
-            
-            start_epoch = int(contest_start.timestamp())
-            end_epoch = int(contest_end.timestamp())
-            
-            return f"<t:{start_epoch}:f> - <t:{end_epoch}:t>"
-        
-        # パターン2: "2025-07-12 21:00:00+0900" 形式
-        iso_match = re.search(r'(\d{4}-\d{2}-\d{2})\s+(\d{1,2}):(\d{2}):\d{2}[+-]\d{4}', date_str)
-        if iso_match:
-            date_part = iso_match.group(1)
-            hour = int(iso_match.group(2))
-            minute = int(iso_match.group(3))
-            
-            # JST timezone
-            jst = timezone(timedelta(hours=9))
-            year, month, day = map(int, date_part.split('-'))
-            contest_start = datetime(year, month, day, hour, minute, tzinfo=jst)
-            contest_end = contest_start + timedelta(minutes=100)
-            
-            start_epoch = int(contest_start.timestamp())
-            end_epoch = int(contest_end.timestamp())
-            
-            return f"<t:{start_epoch}:f> - <t:{end_epoch}:t>"
-            
-    except Exception as e:
-        logger.warning(f"Discordタイムスタンプの生成に失敗: {date_str}, エラー: {e}")
+    contest_time = parse_contest_time(date_str, duration)
+    if contest_time:
+        return contest_time.discord
     
-    # フォールバック: 従来の形式を使用
-    return format_date_string(date_str)
+    # フォーマットに失敗した場合は元の文字列を返す
+    logger.warning(f"Discordタイムスタンプの生成に失敗: {date_str}")
+    return date_str
 
-def format_date_string(date_str: str) -> str:
+def format_date_string(date_str: str, duration: int = DEFAULT_DURATION_SECOND) -> str:
     """AtCoderから取得した日時文字列を見やすい形式に変換"""
-    try:
-        # パターン1: "2025-07-12(土) 21:00" 形式
-        date_match = re.search(r'(\d{4}-\d{2}-\d{2})\(([^)]+)\)\s+(\d{1,2}):(\d{2})', date_str)
-        if date_match:
-            date_part = date_match.group(1).replace('-', '/')
-            day_of_week = date_match.group(2)
-            hour = date_match.group(3)
-            minute = date_match.group(4)
-            
-            # 開始時刻
-            start_time_str = f"{date_part}({day_of_week}) {hour}:{minute}"
-            
-            # 終了時刻を計算（100分後）
-            start_hour = int(hour)
-            start_minute = int(minute)
-            total_minutes = start_hour * 60 + start_minute + 100  # 100分後
-            end_hour = (total_minutes // 60) % 24
-            end_minute = total_minutes % 60
-            
-            end_time_str = f"{end_hour:02d}:{end_minute:02d}"
-            
-            return f"{start_time_str} - {end_time_str}"
-        
-        # パターン2: "2025-07-12 21:00:00+0900" 形式
-        iso_match = re.search(r'(\d{4}-\d{2}-\d{2})\s+(\d{1,2}):(\d{2}):\d{2}[+-]\d{4}', date_str)
-        if iso_match:
-            date_part = iso_match.group(1).replace('-', '/')
-            hour = iso_match.group(2)
-            minute = iso_match.group(3)
-            
-            # 曜日を計算
-            from datetime import datetime
-            year, month, day = map(int, iso_match.group(1).split('-'))
-            weekdays = ['月', '火', '水', '木', '金', '土', '日']
-            day_of_week = weekdays[datetime(year, month, day).weekday()]
-            
-            # 開始時刻
-            start_time_str = f"{date_part}({day_of_week}) {hour}:{minute}"
-            
-            # 終了時刻を計算（100分後）
-            start_hour = int(hour)
-            start_minute = int(minute)
-            total_minutes = start_hour * 60 + start_minute + 100  # 100分後
-            end_hour = (total_minutes // 60) % 24
-            end_minute = total_minutes % 60
-            
-            end_time_str = f"{end_hour:02d}:{end_minute:02d}"
-            
-            return f"{start_time_str} - {end_time_str}"
-            
-    except Exception as e:
-        logger.warning(f"日時文字列のフォーマットに失敗しました: {date_str}, エラー: {e}")
+    contest_time = parse_contest_time(date_str, duration)
+    if contest_time:
+        return contest_time.display
     
     # フォーマットに失敗した場合は元の文字列を返す
+    logger.warning(f"日時文字列のフォーマットに失敗しました: {date_str}")
     return date_str
 
 
@@ -260,36 +162,40 @@ def create_reminder_message(contest_info: dict, message_type: str) -> str:
     """リマインダーメッセージを生成"""
     contest_name = contest_info["title"]
     contest_id = contest_info["contest_id"]
-    contest_url = contest_info.get("contest_url", f"https://atcoder.jp/contests/{contest_id}")
-    
-    # A-G問題のURLを生成
-    problem_links = []
-    for problem in ['a', 'b', 'c', 'd', 'e', 'f', 'g']:
-        problem_url = f"https://atcoder.jp/contests/{contest_id}/tasks/{contest_id}_{problem}"
-        problem_links.append(f"[{problem.upper()}]({problem_url})")
-    problems_text = " ".join(problem_links)
+    contest_url = contest_info.get("contest_url", message_templates.contest_url(contest_id))
     
-    # 開催時間をDiscordタイムスタンプ形式でフォーマット
+    # 開催時間をDiscordタイムスタンプ形式でフォーマット（ContestTimeのキャッシュを使う）
     if contest_info.get("date_str"):
         # スクレイピングで取得した生の文字列をDiscordタイムスタンプに変換
-        contest_time = format_date_string_discord(contest_info["date_str"])
+        contest_time = format_date_string_discord(
+            contest_info["date_str"],
+            contest_info.get("duration_second", DEFAULT_DURATION_SECOND)
+        )
     else:
         # epoch時間からDiscordタイムスタンプに変換
         contest_time = format_contest_time_discord(
             contest_info["start_epoch_second"], 
-            contest_info["duration_second"]
+            contest_info.get("duration_second", DEFAULT_DURATION_SECOND)
         )
     
     if message_type == "morning":
-        message = f"🌅 おはようございます！今日は{contest_name}が開催されます！\n📅 開催時間: {contest_time}\n🔗 {contest_url}"
+        message = message_templates.reminder_morning(contest_name, contest_time, contest_url)
     elif message_type == "evening":
-        message = f"🌙 お疲れ様です！{contest_name}が開催中または間もなく開始です！\n📅 開催時間: {contest_time}\n🔗 {contest_url}\n📝 問題: {problems_text}"
+        # A-G問題のリンクはコンテストごとにキャッシュされる
+        message = message_templates.reminder_evening(
+            contest_name, contest_time, contest_url, message_templates.problem_links(contest_id)
+        )
     else:
-        message = f"📢 {contest_name}のリマインドです！\n📅 開催時間: {contest_time}\n🔗 {contest_url}"
+        message = message_templates.reminder_default(contest_name, contest_time, contest_url)
     
     return message
 
 
+def is_local_url(url: str) -> bool:
+    """ローカルのモックサーバー宛てのURLか（負荷試験用にhttpを許可する）"""
+    return re.match(r'http://(localhost|127\.0\.0\.1)(:\d+)?/', url) is not None
+
+
 def parse_webhook_urls(webhook_urls_str: str) -> list[str]:
     """webhook URL文字列をパースして有効なURLのリストを返す"""
     if not webhook_urls_str:
@@ -299,7 +205,7 @@ def parse_webhook_urls(webhook_urls_str: str) -> list[str]:
     urls = []
     for url in webhook_urls_str.replace(';', ',').replace('\n', ',').split(','):
         url = url.strip()
-        if url and url.startswith('https://'):
+        if url and (url.startswith('https://') or is_local_url(url)):
             urls.append(url)
     
     return urls
@@ -314,16 +220,9 @@ def send_discord_notifications(message: str) -> bool:
         return False
     
     payload = {"content": message}
-    success_count = 0
-    
-    for i, webhook_url in enumerate(webhook_urls, 1):
-        try:
-            res = requests.post(webhook_url, json=payload, timeout=10)
-            res.raise_for_status()
-            logger.info(f"Discord通知 {i}/{len(webhook_urls)} に成功しました。")
-            success_count += 1
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Discord通知 {i}/{len(webhook_urls)} に失敗しました: {e}")
+    # 失敗し続けるWebhookはサーキットブレーカーで送信を間引く
+    results = webhook_health.deliver(webhook_urls, payload, WEBHOOK_HEALTH_FILE)
+    success_count = sum(status == webhook_health.SENT for status in results.values())
     
     if success_count > 0:
         logger.info(f"Discord通知: {success_count}/{len(webhook_urls)} 件が成功しました。")
@@ -349,32 +248,20 @@ def get_current_message_type() -> str:
         return "default"
 
 
-def is_contest_today(contest_info: dict) -> bool:
-    """コンテストが今日開催されるかチェック"""
-    if not contest_info or contest_info.get("start_epoch_second", 0) == 0:
-        return False
-    
-    # JST timezone
-    jst = timezone(timedelta(hours=9))
-    today = datetime.now(jst).date()
-    contest_date = datetime.fromtimestamp(contest_info["start_epoch_second"], tz=jst).date()
-    
-    return today == contest_date
-
-
 def main():
     """メイン処理"""
     logger.info("ABC コンテストリマインダーを開始します。")
     
-    # 最新のABCコンテスト情報を取得
-    contest_info = get_latest_abc_contest()
-    if not contest_info:
-        logger.info("最新のABC情報が取得できませんでした。")
+    # 開催予定のABCカレンダーを取得（有効期限内ならファイルから読むだけ）
+    calendar = contest_calendar.get_calendar(fetch_upcoming_abc_contests)
+    if not calendar:
+        logger.info("開催予定のABC情報が取得できませんでした。")
         sys.exit(0)
     
-    # コンテストが今日開催されるかチェック
-    if not is_contest_today(contest_info):
-        logger.info(f"コンテスト {contest_info['title']} は今日開催されません。")
+    # 今日開催されるコンテストを探す
+    contest_info = contest_calendar.find_contest_today(calendar)
+    if not contest_info:
+        logger.info("今日開催されるABCはありません。")
         sys.exit(0)
     
     # メッセージタイプを決定
@@ -394,4 +281,9 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    profiling.enable_from_args(sys.argv[1:])
+    try:
+        main()
+    finally:
+        atcoder_client.log_metrics()
+        profiling.write_reports()
\ No newline at end of file
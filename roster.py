@@ -0,0 +1,39 @@
+import os
+
+# 監視対象ユーザー（ロスター）の読み込み
+# 単一ユーザー用の ATCODER_USER_ID に加えて、複数ユーザーをまとめて扱うための設定を提供する
+
+# --- 設定項目 ---
+# GitHub Actionsの環境変数から取得
+ATCODER_USER_ID = os.environ.get("ATCODER_USER_ID")
+ATCODER_USER_IDS = os.environ.get("ATCODER_USER_IDS", "")
+ATCODER_ROSTER_FILE = os.environ.get("ATCODER_ROSTER_FILE", "")
+
+
+def parse_user_ids(user_ids_str: str) -> list[str]:
+    """ユーザーID文字列をパースしてIDのリストを返す（重複は除く）"""
+    if not user_ids_str:
+        return []
+
+    # カンマ、セミコロン、改行で分割
+    user_ids = []
+    seen = set()
+    for user_id in user_ids_str.replace(';', ',').replace('\n', ',').split(','):
+        user_id = user_id.strip()
+        if user_id and not user_id.startswith('#') and user_id not in seen:
+            seen.add(user_id)
+            user_ids.append(user_id)
+
+    return user_ids
+
+
+def load_roster() -> list[str]:
+    """環境変数とロスターファイルから監視対象のユーザーIDを読み込む"""
+    user_ids_str = ATCODER_USER_ID or ""
+    user_ids_str += "\n" + ATCODER_USER_IDS
+    if ATCODER_ROSTER_FILE and os.path.exists(ATCODER_ROSTER_FILE):
+        # 1行1ユーザーのファイル（数千人規模のロスター向け）
+        with open(ATCODER_ROSTER_FILE, "r") as f:
+            user_ids_str += "\n" + f.read()
+
+    return parse_user_ids(user_ids_str)
@@ -1,19 +1,27 @@
 #!/usr/bin/env python3
 import requests
 from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
 import re
 import sys
+import os
+
+# リポジトリ直下のモジュールを読み込めるようにする
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import atcoder_client
+import profiling
+from contest_time import parse_contest_time
 
 def get_latest_abc():
     """AtCoderのコンテスト一覧から最新のABCコンテストを取得"""
-    url = "https://atcoder.jp/contests/"
+    url = f"{atcoder_client.ATCODER_BASE_URL}/contests/"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = atcoder_client.get(url, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with profiling.stage("parse"):
+            soup = BeautifulSoup(response.content, 'html.parser')
         
         # 開催予定のコンテストテーブルを探す
         upcoming_table = soup.find('div', id='contest-table-upcoming')
@@ -62,23 +70,18 @@ def get_latest_abc():
 
 def parse_contest_date(date_str):
     """コンテスト日時文字列をパース"""
-    # 例: "2025-07-12(土) 21:00" の形式を想定
-    try:
-        # 日付部分を抽出
-        date_match = re.search(r'(\d{4}-\d{2}-\d{2})', date_str)
-        if date_match:
-            date_part = date_match.group(1)
-            contest_date = datetime.strptime(date_part, '%Y-%m-%d')
-            return contest_date
-    except:
-        pass
+    # 例: "2025-07-12(土) 21:00" の形式を想定（リマインダーと同じ解析結果を共有する）
+    contest_time = parse_contest_time(date_str, 0)
+    if contest_time:
+        return contest_time.start.replace(hour=0, minute=0, tzinfo=None)
     return None
 
 def is_weekend(date_obj):
     """土曜日または日曜日かチェック"""
     return date_obj.weekday() in [5, 6]  # 5=土曜日, 6=日曜日
 
-if __name__ == "__main__":
+def main():
+    """最新のABC情報を表示する"""
     abc_info = get_latest_abc()
     
     if abc_info:
@@ -95,4 +98,12 @@ if __name__ == "__main__":
             print(f"Not a weekend contest: {contest_date.strftime('%Y-%m-%d (%a)')}")
     else:
         print("No ABC contest found")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    profiling.enable_from_args(sys.argv[1:])
+    try:
+        main()
+    finally:
+        profiling.write_reports()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""AtCoderとDiscord Webhookのローカル代替サーバー（負荷試験用）
+
+notifier.py（--roster を含む） / reminder.py / rating_stats.py を ATCODER_BASE_URL でこのサーバーに向けると、
+atcoder.jp や実際のDiscordにアクセスせずにパイプライン全体を再現性のある形で実行できる。
+
+    python scripts/mock_server.py --port 8000 --users 1000 --latency-ms 50 --error-rate 0.05
+    ATCODER_BASE_URL=http://127.0.0.1:8000 ATCODER_REQUESTS_PER_SECOND=0 \\
+    ATCODER_USER_ID=user0001 DISCORD_WEBHOOK_URLS_NOTIFIER=http://127.0.0.1:8000/api/webhooks/1/token \\
+    python notifier.py
+"""
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# JST（日本標準時）のタイムゾーン
+JST = timezone(timedelta(hours=9))
+
+# 最新のABCの番号（履歴はここから過去にさかのぼって生成する）
+LATEST_ABC = 420
+
+
+class MockConfig:
+    """コマンドライン引数から作るサーバーの設定"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.seed = args.seed
+        self.users = args.users
+        self.contests = args.contests
+        self.latency = args.latency_ms / 1000
+        self.jitter = args.jitter_ms / 1000
+        self.error_rate = args.error_rate
+        self.error_codes = [int(code) for code in args.error_codes.split(",") if code]
+        self.padding = args.padding_kb * 1024
+        self.contest_today = args.contest_today
+        self.participants = args.participants
+        self.random = random.Random(args.seed)
+        self.lock = threading.Lock()
+        # 統計（パスの種類ごとのリクエスト数・Webhookごとの受信数）
+        self.stats = {"requests": {}, "errors": {}, "webhooks": {}}
+
+    def count(self, key: str, name: str):
+        with self.lock:
+            self.stats[key][name] = self.stats[key].get(name, 0) + 1
+
+    def pick_error(self) -> int | None:
+        """設定された確率でエラーのステータスコードを返す"""
+        with self.lock:
+            if self.error_codes and self.random.random() < self.error_rate:
+                return self.random.choice(self.error_codes)
+        return None
+
+    def delay(self) -> float:
+        with self.lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+
+def user_history(config: MockConfig, user_id: str) -> list[dict]:
+    """ユーザーIDから決定的にコンテスト履歴（/history/json 形式）を生成する"""
+    rng = random.Random(config.seed * 1_000_003 + zlib.crc32(user_id.encode()))
+    history = []
+    rating = 0
+    end = datetime(2025, 1, 4, 22, 40, tzinfo=JST)
+    first = LATEST_ABC - config.contests + 1
+    for number in range(first, LATEST_ABC + 1):
+        contest_end = end + timedelta(weeks=number - first)
+        if rng.random() < 0.3 and number != LATEST_ABC:
+            continue
+        performance = max(0, int(rng.gauss(max(rating, 400), 300)))
+        new_rating = max(1, rating + (performance - rating) // 4 if rating else performance // 4)
+        history.append({
+            "IsRated": True,
+            "Place": rng.randint(1, 12000),
+            "OldRating": rating,
+            "NewRating": new_rating,
+            "Performance": performance,
+            "InnerPerformance": performance,
+            "ContestScreenName": f"abc{number}.contest.atcoder.jp",
+            "ContestName": f"AtCoder Beginner Contest {number}",
+            "ContestNameEn": f"AtCoder Beginner Contest {number}",
+            "EndTime": contest_end.isoformat(),
+        })
+        rating = new_rating
+    return history
+
+
+def render_history_page(config: MockConfig, user_id: str) -> str:
+    """/users/{id}/history のHTML（table#history）"""
+    rows = []
+    for entry in reversed(user_history(config, user_id)):
+        contest_id = entry["ContestScreenName"].split(".")[0]
+        end = datetime.fromisoformat(entry["EndTime"])
+        change = entry["NewRating"] - entry["OldRating"]
+        rows.append(
+            f'<tr><td class="text-right" data-order="{end.strftime("%Y/%m/%d %H:%M:%S")}">'
+            f'<time>{end.strftime("%Y-%m-%d %H:%M:%S%z")}</time></td>'
+            f'<td class="text-left"><a href="/contests/{contest_id}">{entry["ContestName"]}</a></td>'
+            f'<td><a href="/contests/{contest_id}/standings?watching={user_id}">{entry["Place"]}</a></td>'
+            f'<td>{entry["Performance"]}</td>'
+            f'<td><span class="user-green">{entry["NewRating"]}</span></td>'
+            f'<td>{change:+d}</td>'
+            f'<td><a href="/users/{user_id}/history/share/{contest_id}">share</a></td></tr>'
+        )
+    padding = f"<!-- {'x' * config.padding} -->" if config.padding else ""
+    return (
+        f"<html><body>{padding}<table id=\"history\"><thead><tr><th>日付</th><th>コンテスト</th>"
+        f"<th>順位</th><th>パフォーマンス</th><th>新Rating</th><th>差分</th><th></th></tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody></table></body></html>"
+    )
+
+
+def render_share_page(config: MockConfig, user_id: str, contest_id: str) -> str | None:
+    """/users/{id}/history/share/{contest} のHTML（参加していなければNone）"""
+    for entry in user_history(config, user_id):
+        if entry["ContestScreenName"].split(".")[0] == contest_id:
+            change = entry["NewRating"] - entry["OldRating"]
+            lines = [
+                "Contest Name", entry["ContestName"],
+                "Rank", f"{entry['Place']}th", "(12000)",
+                "Performance", str(entry["Performance"]),
+                "Rating Change", str(entry["OldRating"]), "→", str(entry["NewRating"]), f"({change:+d})",
+            ]
+            return f'<html><body><div class="panel-body">{"<br>".join(lines)}</div></body></html>'
+    return None
+
+
+def contest_results(config: MockConfig, contest_id: str) -> list[dict]:
+    """/contests/{id}/results/json（ロスターのユーザーと、それ以外の参加者を混ぜた順位順の結果）"""
+    entries = []
+    for i in range(config.users):
+        user_id = f"user{i:04d}"
+        for entry in user_history(config, user_id):
+            if entry["ContestScreenName"].split(".")[0] == contest_id:
+                entries.append(dict(entry, UserScreenName=user_id, UserName=user_id))
+
+    if not entries and config.participants == 0:
+        return []
+
+    rng = random.Random(config.seed * 7919 + zlib.crc32(contest_id.encode()))
+    number = contest_id[3:]
+    for i in range(config.participants):
+        rating = rng.randint(0, 3000)
+        change = rng.randint(-100, 100)
+        entries.append({
+            "IsRated": True,
+            "Place": rng.randint(1, 12000),
+            "OldRating": rating,
+            "NewRating": max(1, rating + change),
+            "Performance": max(0, rating + change * 4),
+            "InnerPerformance": max(0, rating + change * 4),
+            "ContestScreenName": f"{contest_id}.contest.atcoder.jp",
+            "ContestName": f"AtCoder Beginner Contest {number}",
+            "ContestNameEn": f"AtCoder Beginner Contest {number}",
+            "EndTime": "",
+            "UserName": f"anon{i:05d}",
+            "UserScreenName": f"anon{i:05d}",
+            "Country": "JP",
+            "Affiliation": "",
+        })
+    entries.sort(key=lambda entry: entry["Place"])
+    return entries
+
+
+def render_contests_page(config: MockConfig) -> str:
+    """/contests/ のHTML（開催予定のコンテスト）"""
+    today = datetime.now(JST).replace(hour=21, minute=0, second=0, microsecond=0)
+    days_until_saturday = (5 - today.weekday()) % 7 or 7
+    starts = [today + timedelta(days=days_until_saturday + 7 * i) for i in range(3)]
+    if config.contest_today:
+        starts[0] = today
+
+    rows = []
+    for i, start in enumerate(starts):
+        number = LATEST_ABC + 1 + i
+        rows.append(
+            f'<tr><td class="text-center"><a href="#"><time class="fixtime fixtime-full">'
+            f'{start.strftime("%Y-%m-%d %H:%M:%S%z")}</time></a></td>'
+            f'<td><a href="/contests/abc{number}">AtCoder Beginner Contest {number}</a></td>'
+            f'<td class="text-center">01:40</td><td class="text-center"> - 1999</td></tr>'
+        )
+    return (
+        '<html><body><div id="contest-table-upcoming"><table><tbody>'
+        f"{''.join(rows)}</tbody></table></div></body></html>"
+    )
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    config: MockConfig = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status: int, body: str, content_type: str = "text/html; charset=utf-8", headers: dict | None = None):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def inject(self, kind: str) -> bool:
+        """遅延とエラーを注入する（エラーを返した場合はTrue）"""
+        self.config.count("requests", kind)
+        time.sleep(self.config.delay())
+        status = self.config.pick_error()
+        if status is None:
+            return False
+        self.config.count("errors", str(status))
+        headers = {"Retry-After": "1"} if status == 429 else None
+        self.send_body(status, f"injected {status}", "text/plain", headers)
+        return True
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+
+        if path == "/_stats":
+            self.send_body(200, json.dumps(self.config.stats), "application/json")
+            return
+
+        routes = [
+            (r"/users/([\w-]+)/history/json", "history_json"),
+            (r"/users/([\w-]+)/history/share/(\w+)", "share"),
+            (r"/users/([\w-]+)/history", "history"),
+            (r"/contests/(\w+)/results/json", "results_json"),
+            (r"/contests/?", "contests"),
+        ]
+        for pattern, kind in routes:
+            match = re.fullmatch(pattern, path)
+            if match:
+                break
+        else:
+            self.send_body(404, "not found", "text/plain")
+            return
+
+        if self.inject(kind):
+            return
+
+        if kind == "contests":
+            self.send_body(200, render_contests_page(self.config))
+            return
+        if kind == "results_json":
+            self.send_body(200, json.dumps(contest_results(self.config, match.group(1))), "application/json")
+            return
+
+        user_id = match.group(1)
+        if user_id.startswith("missing"):
+            self.send_body(404, "user not found", "text/plain")
+        elif kind == "history_json":
+            self.send_body(200, json.dumps(user_history(self.config, user_id)), "application/json")
+        elif kind == "history":
+            self.send_body(200, render_history_page(self.config, user_id))
+        else:
+            page = render_share_page(self.config, user_id, match.group(2))
+            if page is None:
+                self.send_body(404, "not participated", "text/plain")
+            else:
+                self.send_body(200, page)
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        match = re.fullmatch(r"/api/webhooks/(\d+)/([\w-]+)", path)
+        # リクエストボディは読み捨てる
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not match:
+            self.send_body(404, json.dumps({"message": "Unknown Webhook", "code": 10015}), "application/json")
+            return
+        if self.inject("webhook"):
+            return
+        self.config.count("webhooks", match.group(1))
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AtCoderとDiscord Webhookのローカル代替サーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--seed", type=int, default=0, help="生成データと注入するエラーの乱数シード")
+    parser.add_argument("--users", type=int, default=1000, help="roster.txt に書き出すユーザー数")
+    parser.add_argument("--contests", type=int, default=50, help="ユーザーごとの履歴に含めるABCの数")
+    parser.add_argument("--latency-ms", type=float, default=0, help="各レスポンスに加える遅延（ミリ秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="遅延のばらつき（ミリ秒）")
+    parser.add_argument("--error-rate", type=float, default=0, help="エラーを返す確率（0〜1）")
+    parser.add_argument("--error-codes", default="429,500,503", help="注入するステータスコード（カンマ区切り）")
+    parser.add_argument("--padding-kb", type=int, default=0, help="HTMLに加える詰め物のサイズ（大きなページの再現）")
+    parser.add_argument("--participants", type=int, default=10000, help="結果JSONに加えるロスター外の参加者数")
+    parser.add_argument("--contest-today", action="store_true", help="今日21:00開始のABCを開催予定に含める")
+    parser.add_argument("--roster-file", default="roster.txt", help="生成したユーザーIDの書き出し先（空なら書き出さない）")
+    args = parser.parse_args()
+
+    MockHandler.config = MockConfig(args)
+    if args.roster_file:
+        # ATCODER_ROSTER_FILE にそのまま渡せる1行1ユーザーのファイル
+        with open(args.roster_file, "w") as f:
+            f.write("\n".join(f"user{i:04d}" for i in range(args.users)) + "\n")
+
+    server = ThreadingHTTPServer((args.host, args.port), MockHandler)
+    print(f"Mock server listening on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
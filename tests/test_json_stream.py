@@ -0,0 +1,48 @@
+import json
+import unittest
+
+from json_stream import iter_json_array
+
+# チャンクの境目（数値・文字列・マルチバイト文字の途中など）でも同じ結果になることを確認する
+PAYLOAD = [
+    {"UserScreenName": "tourist", "Place": 1, "OldRating": 3800, "NewRating": 3810, "IsRated": True},
+    {"UserScreenName": "ユーザー", "Place": 12, "Performance": 1234.5, "Rate": -0.125e-3, "IsRated": False},
+    [0, 10, -7, 1e10, None, "a\"b\\cあ"],
+    3.14159,
+    "",
+    {},
+    [],
+]
+
+
+def split_every(data: bytes, size: int) -> list[bytes]:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    def test_every_chunk_size(self):
+        for indent in (None, 2):
+            data = json.dumps(PAYLOAD, ensure_ascii=False, indent=indent).encode("utf-8")
+            for size in range(1, len(data) + 1):
+                with self.subTest(indent=indent, size=size):
+                    self.assertEqual(list(iter_json_array(split_every(data, size))), PAYLOAD)
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array([b" [ ", b"] "])), [])
+
+    def test_stops_reading_when_consumer_stops(self):
+        def chunks():
+            yield b'[{"a": 1},'
+            raise AssertionError("残りのチャンクを読んではいけない")
+
+        self.assertEqual(next(iter_json_array(chunks())), {"a": 1})
+
+    def test_invalid_input(self):
+        for data in (b'{"a": 1}', b"", b"[1, 2", b"[1 2]", b"[1,]", b"[1, ]", b"[,1]"):
+            with self.subTest(data=data):
+                with self.assertRaises(ValueError):
+                    list(iter_json_array([data]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,262 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import requests
+from logging import getLogger, StreamHandler, INFO
+
+import profiling
+
+# Discord Webhookの健全性の記録とサーキットブレーカー
+# 送信結果をファイルに保存し、失敗し続けるWebhookは一定間隔の試行（プローブ）だけにする
+
+# ロガーの設定
+logger = getLogger(__name__)
+handler = StreamHandler(sys.stdout)
+handler.setLevel(INFO)
+logger.addHandler(handler)
+logger.setLevel(INFO)
+
+# --- 定数 ---
+FAILURE_THRESHOLD = 3  # サーキットを開く連続失敗回数
+DEAD_STATUS_CODES = (401, 404)  # Webhookが削除・無効化されている場合のステータス
+PROBE_INTERVAL_SECONDS = 15 * 60  # 開いたサーキットを試す最初の間隔
+DEAD_PROBE_INTERVAL_SECONDS = 24 * 3600  # 削除済みと思われるWebhookを試す間隔
+MAX_PROBE_INTERVAL_SECONDS = 7 * 24 * 3600
+SEND_TIMEOUT_SECONDS = 10
+PROBE_TIMEOUT_SECONDS = 3  # プローブは短いタイムアウトで試す
+# deliver() が返すWebhookごとの送信結果
+SENT = "sent"
+FAILED = "failed"
+SKIPPED = "skipped"  # サーキットが開いているため送信しなかった
+LATENCY_SAMPLES = 50  # パーセンタイル計算に残す直近のレイテンシ数
+# Discordのレート制限（429はRetry-Afterだけ待って再送し、サーキットの失敗には数えない）
+RATE_LIMIT_STATUS_CODE = 429
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_RATE_LIMIT_WAIT_SECONDS = 30  # これより長く待つよう指示された場合は今回の送信を諦める
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+
+# Webhookごとに次に送信してよい時刻（time.monotonic、プロセス内で共有する）
+_next_send_at: dict[str, float] = {}
+
+
+def webhook_key(url: str) -> str:
+    """Webhook URLから状態ファイル用のキーを作る（トークンを含むURLそのものは保存しない）"""
+    return hashlib.sha256(url.encode()).hexdigest()[:16]
+
+
+def webhook_label(url: str) -> str:
+    """ログ用のWebhook表示名（Discord Webhook ID、なければハッシュ）"""
+    id_match = re.search(r'/webhooks/(\d+)/', url)
+    return f"webhook {id_match.group(1)}" if id_match else f"webhook {webhook_key(url)}"
+
+
+def percentile(samples: list[float], p: float) -> float:
+    """サンプルのパーセンタイルを返す（最近傍法）"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def get_retry_after(res: requests.Response) -> float:
+    """429の応答から待機秒数を決める（Retry-Afterヘッダ、なければDiscordのretry_after）"""
+    retry_after = res.headers.get("Retry-After")
+    if retry_after is None:
+        try:
+            retry_after = res.json().get("retry_after")
+        except (ValueError, AttributeError):
+            retry_after = None
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+
+
+def remember_rate_limit(url: str, res: requests.Response):
+    """レート制限の残りがなくなった・429を受けた場合に、次に送信してよい時刻を記録する"""
+    if res.status_code == RATE_LIMIT_STATUS_CODE:
+        wait = get_retry_after(res)
+    elif res.headers.get("X-RateLimit-Remaining") == "0":
+        try:
+            wait = max(0.0, float(res.headers.get("X-RateLimit-Reset-After", DEFAULT_RETRY_AFTER_SECONDS)))
+        except ValueError:
+            wait = DEFAULT_RETRY_AFTER_SECONDS
+    else:
+        return
+    _next_send_at[webhook_key(url)] = time.monotonic() + wait
+
+
+def wait_for_rate_limit(url: str) -> float:
+    """レート制限が解除されるまで待ち、待った秒数を返す"""
+    wait = _next_send_at.get(webhook_key(url), 0) - time.monotonic()
+    if wait <= 0:
+        return 0.0
+    time.sleep(wait)
+    return wait
+
+
+def post_webhook(url: str, payload: dict, timeout: float) -> requests.Response:
+    """Discordのレート制限に従ってWebhookに送信する（429はRetry-Afterだけ待って再送する）"""
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        wait_for_rate_limit(url)
+        with profiling.stage("webhook_send"):
+            res = requests.post(url, json=payload, timeout=timeout)
+        remember_rate_limit(url, res)
+        if res.status_code != RATE_LIMIT_STATUS_CODE or attempt == MAX_RATE_LIMIT_RETRIES:
+            return res
+        retry_after = get_retry_after(res)
+        if retry_after > MAX_RATE_LIMIT_WAIT_SECONDS:
+            return res
+        logger.info(f"{webhook_label(url)} のレート制限のため {retry_after:.1f}秒待って再送します。")
+
+
+class WebhookHealth:
+    """Webhookごとの連続失敗回数・レイテンシとサーキットの状態"""
+
+    def __init__(self, state_file: str):
+        self.state_file = state_file
+        self.entries = self._load()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.info(f"Webhook状態ファイルの読み込みに失敗: {e}")
+            return {}
+
+    def save(self):
+        """状態をファイルに書き込む"""
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_file, self.state_file)
+
+    def _entry(self, url: str) -> dict:
+        return self.entries.setdefault(webhook_key(url), {
+            "label": webhook_label(url),
+            "consecutive_failures": 0,
+            "successes": 0,
+            "failures": 0,
+            "last_status": None,
+            "dead": False,
+            "open": False,
+            "probe_interval": 0,
+            "next_probe_at": 0,
+            "latencies": [],
+        })
+
+    def should_send(self, url: str, now: float | None = None) -> bool:
+        """送信してよいか（サーキットが閉じているか、プローブの時刻になっているか）"""
+        entry = self.entries.get(webhook_key(url))
+        if not entry or not entry["open"]:
+            return True
+        now = now if now is not None else time.time()
+        return now >= entry["next_probe_at"]
+
+    def timeout_for(self, url: str) -> float:
+        """送信時のタイムアウト（プローブは短くする）"""
+        entry = self.entries.get(webhook_key(url))
+        return PROBE_TIMEOUT_SECONDS if entry and entry["open"] else SEND_TIMEOUT_SECONDS
+
+    def record_success(self, url: str, latency: float):
+        entry = self._entry(url)
+        if entry["open"]:
+            logger.info(f"{entry['label']} が復旧しました。")
+        entry.update({
+            "consecutive_failures": 0,
+            "successes": entry["successes"] + 1,
+            "last_status": 200,
+            "dead": False,
+            "open": False,
+            "probe_interval": 0,
+            "next_probe_at": 0,
+        })
+        entry["latencies"] = (entry["latencies"] + [round(latency, 3)])[-LATENCY_SAMPLES:]
+
+    def record_failure(self, url: str, latency: float, status_code: int | None = None, now: float | None = None):
+        entry = self._entry(url)
+        now = now if now is not None else time.time()
+        entry["consecutive_failures"] += 1
+        entry["failures"] += 1
+        entry["last_status"] = status_code
+        entry["latencies"] = (entry["latencies"] + [round(latency, 3)])[-LATENCY_SAMPLES:]
+
+        dead = status_code in DEAD_STATUS_CODES
+        if not dead and entry["consecutive_failures"] < FAILURE_THRESHOLD:
+            return
+
+        # サーキットを開く（開いている場合はプローブ間隔を倍にする）
+        if entry["open"]:
+            interval = min(MAX_PROBE_INTERVAL_SECONDS, entry["probe_interval"] * 2)
+        else:
+            interval = DEAD_PROBE_INTERVAL_SECONDS if dead else PROBE_INTERVAL_SECONDS
+        entry.update({
+            "dead": dead,
+            "open": True,
+            "probe_interval": interval,
+            "next_probe_at": now + interval,
+        })
+        logger.info(f"{entry['label']} への送信を停止します（次の試行は {interval // 60} 分後）。")
+
+    def report(self, urls: list[str]) -> list[str]:
+        """設定中のWebhookの状態をログに出力し、削除を検討すべきWebhookの表示名を返す"""
+        to_remove = []
+        for url in urls:
+            entry = self.entries.get(webhook_key(url))
+            if not entry:
+                continue
+            if entry["latencies"]:
+                logger.info(
+                    f"{entry['label']}: p50 {percentile(entry['latencies'], 50) * 1000:.0f}ms, "
+                    f"p95 {percentile(entry['latencies'], 95) * 1000:.0f}ms, "
+                    f"連続失敗 {entry['consecutive_failures']} 回"
+                )
+            if entry["dead"] or (entry["open"] and entry["probe_interval"] >= MAX_PROBE_INTERVAL_SECONDS):
+                to_remove.append(entry["label"])
+
+        if to_remove:
+            logger.warning(f"次のWebhookは応答しないため設定からの削除を検討してください: {', '.join(to_remove)}")
+        return to_remove
+
+
+def deliver(webhook_urls: list[str], payload: dict, state_file: str) -> dict[str, str]:
+    """複数のWebhookに送信し、URLごとの結果（SENT / FAILED / SKIPPED）を返す
+
+    サーキットが開いているWebhookには送信せず SKIPPED を返す（失敗とは区別する）。
+    レート制限（429）は再送しても解除されなかった場合だけ FAILED とし、サーキットの失敗には数えない。
+    """
+    health = WebhookHealth(state_file)
+    results = {}
+
+    for i, webhook_url in enumerate(webhook_urls, 1):
+        if not health.should_send(webhook_url):
+            logger.info(f"Discord通知 {i}/{len(webhook_urls)} はサーキットが開いているためスキップしました。")
+            results[webhook_url] = SKIPPED
+            continue
+
+        started_at = time.monotonic()
+        try:
+            res = post_webhook(webhook_url, payload, health.timeout_for(webhook_url))
+            if res.status_code == RATE_LIMIT_STATUS_CODE:
+                logger.warning(f"Discord通知 {i}/{len(webhook_urls)} はレート制限のため送信できませんでした。")
+                results[webhook_url] = FAILED
+                continue
+            res.raise_for_status()
+            # レイテンシにはレート制限の待機時間を含めない
+            health.record_success(webhook_url, res.elapsed.total_seconds())
+            logger.info(f"Discord通知 {i}/{len(webhook_urls)} に成功しました。")
+            results[webhook_url] = SENT
+        except requests.exceptions.RequestException as e:
+            status_code = e.response.status_code if e.response is not None else None
+            health.record_failure(webhook_url, time.monotonic() - started_at, status_code)
+            logger.error(f"Discord通知 {i}/{len(webhook_urls)} に失敗しました: {e}")
+            results[webhook_url] = FAILED
+
+    health.report(webhook_urls)
+    health.save()
+    return results
@@ -0,0 +1,204 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import requests
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from logging import getLogger, StreamHandler, INFO
+
+import atcoder_client
+import profiling
+
+# 常駐ワーカー
+# 通知・リマインダーを1つのプロセスで繰り返し実行し、HTTPセッション（接続プール）や
+# コンテスト日時・メッセージのキャッシュを実行間で使い回す。cronやsystemdタイマーからは
+# 新しいインタプリタを起動する代わりに `python worker.py trigger <job>` でワーカーを呼び出す
+
+# ロガーの設定
+logger = getLogger(__name__)
+handler = StreamHandler(sys.stdout)
+handler.setLevel(INFO)
+logger.addHandler(handler)
+logger.setLevel(INFO)
+
+# --- 設定項目 ---
+# 制御APIの待ち受けポート（127.0.0.1のみで待ち受ける）
+ATCODER_WORKER_PORT = int(os.environ.get("ATCODER_WORKER_PORT", "8787"))
+
+# --- 定数 ---
+WORKER_HOST = "127.0.0.1"
+TRIGGER_TIMEOUT_SECONDS = 15 * 60  # ジョブの完了を待つ最大時間
+EXIT_WORKER_UNAVAILABLE = 2  # ワーカーに接続できなかった場合の終了コード
+EXIT_WORKER_BUSY = 75  # 別のジョブを実行中だった場合の終了コード（EX_TEMPFAIL）
+
+JOBS = ("notifier", "roster", "reminder")
+
+# 状態ファイルを共有するため、ジョブは同時に1つだけ実行する
+_run_lock = threading.Lock()
+_started_at = time.time()
+_job_stats: dict[str, dict] = {}
+
+
+def load_job(name: str):
+    """ジョブ名に対応する関数を返す（引数はクエリパラメータ）
+
+    通知・リマインダーのモジュールはワーカー側でだけ読み込み、trigger の起動を軽くする。
+    """
+    if name == "reminder":
+        import reminder
+        return lambda params: reminder.main()
+    import notifier
+    if name == "roster":
+        return lambda params: notifier.main_roster(params.get("contest"))
+    return lambda params: notifier.main()
+
+
+def run_job(name: str, params: dict) -> dict:
+    """ジョブを実行し、終了コードと所要時間を返す（sys.exitはワーカーを終了させずに終了コードとして扱う）"""
+    metrics_before = dict(atcoder_client.metrics)
+    started_at = time.monotonic()
+    try:
+        load_job(name)(params)
+        exit_code = 0
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        logger.exception(f"ジョブ {name} で予期しないエラーが発生しました。")
+        exit_code = 1
+    finally:
+        profiling.write_reports()
+    seconds = time.monotonic() - started_at
+
+    # 今回の実行分のHTTP計測値（累計との差分）
+    metrics = {key: value - metrics_before.get(key, 0) for key, value in atcoder_client.metrics.items()}
+    record = _job_stats.setdefault(name, {"runs": 0, "failures": 0})
+    record["runs"] += 1
+    record["failures"] += exit_code != 0
+    record.update({
+        "last_exit_code": exit_code,
+        "last_seconds": round(seconds, 3),
+        "last_finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    })
+    logger.info(f"ジョブ {name} が終了しました（終了コード {exit_code}, {seconds:.2f}秒, HTTPリクエスト {metrics['requests']} 件）")
+    return {"job": name, "exit_code": exit_code, "seconds": round(seconds, 3), "metrics": metrics}
+
+
+class WorkerHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self.send_json(200, {"status": "ok", "busy": _run_lock.locked()})
+        elif path == "/metrics":
+            self.send_json(200, {
+                "uptime_seconds": round(time.time() - _started_at),
+                "http": atcoder_client.metrics,
+                "jobs": _job_stats,
+            })
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        name = url.path.removeprefix("/run/")
+        if not url.path.startswith("/run/") or name not in JOBS:
+            self.send_json(404, {"error": f"unknown job: {name}"})
+            return
+        # 前回のジョブが終わっていなければ重ねて実行しない
+        if not _run_lock.acquire(blocking=False):
+            self.send_json(409, {"error": "busy", "job": name})
+            return
+        try:
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            self.send_json(200, run_job(name, params))
+        finally:
+            _run_lock.release()
+
+
+def serve(port: int):
+    """制御APIを起動してジョブの呼び出しを待つ"""
+    # 起動時にモジュールを読み込んでおき、最初のジョブから温まった状態で実行する
+    for name in JOBS:
+        load_job(name)
+    server = ThreadingHTTPServer((WORKER_HOST, port), WorkerHandler)
+    logger.info(f"ワーカーを起動しました: http://{WORKER_HOST}:{port}（ジョブ: {', '.join(JOBS)}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        atcoder_client.log_metrics()
+
+
+def trigger(port: int, name: str, params: dict, fallback: bool) -> int:
+    """ワーカーにジョブを実行させ、ジョブの終了コードを返す"""
+    url = f"http://{WORKER_HOST}:{port}/run/{name}"
+    try:
+        res = requests.post(url, params=params, timeout=TRIGGER_TIMEOUT_SECONDS)
+    except requests.exceptions.ConnectionError:
+        if not fallback:
+            logger.error(f"ワーカーに接続できませんでした: {url}")
+            return EXIT_WORKER_UNAVAILABLE
+        # ワーカーが起動していなければこのプロセスで実行する
+        logger.info("ワーカーに接続できないため、このプロセスでジョブを実行します。")
+        return run_job(name, params)["exit_code"]
+    except requests.exceptions.RequestException as e:
+        # 応答待ちのタイムアウトなど（ジョブはワーカーで実行中の可能性があるため、このプロセスでは実行しない）
+        logger.error(f"ワーカーからの応答を受け取れませんでした: {e}")
+        return EXIT_WORKER_UNAVAILABLE
+
+    if res.status_code == 409:
+        logger.info(f"ワーカーは別のジョブを実行中のため、{name} をスキップしました。")
+        return EXIT_WORKER_BUSY
+    if res.status_code != 200:
+        logger.error(f"ジョブ {name} を実行できませんでした: {res.status_code} {res.text}")
+        return 1
+
+    try:
+        result = res.json()
+        exit_code, seconds = result["exit_code"], result["seconds"]
+    except (ValueError, KeyError, TypeError) as e:
+        logger.error(f"ワーカーの応答を解釈できませんでした: {e}")
+        return 1
+    logger.info(f"ジョブ {name}: 終了コード {exit_code}, {seconds:.2f}秒")
+    return exit_code
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="通知・リマインダーの常駐ワーカー")
+    parser.add_argument("--port", type=int, default=ATCODER_WORKER_PORT, help="制御APIのポート")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("serve", help="ワーカーを起動する")
+
+    trigger_parser = subparsers.add_parser("trigger", help="ワーカーにジョブを実行させる")
+    trigger_parser.add_argument("job", choices=JOBS)
+    trigger_parser.add_argument("--contest", help="roster ジョブで対象にするコンテストID")
+    trigger_parser.add_argument(
+        "--fallback", action="store_true", help="ワーカーに接続できない場合はこのプロセスで実行する"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(profiling.enable_from_args(sys.argv[1:]))
+    if args.command == "serve":
+        serve(args.port)
+    else:
+        params = {"contest": args.contest} if args.contest else {}
+        sys.exit(trigger(args.port, args.job, params, args.fallback))